@@ -27,6 +27,14 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+# Postgres-only objects created by hand in migrations, not declared on the models
+MIGRATION_ONLY_OBJECTS = {"search_vector", "ix_books_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return name not in MIGRATION_ONLY_OBJECTS
+
+
 def get_url():
     return settings.DATABASE_URL
 
@@ -49,6 +57,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -56,7 +65,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,26 @@
+"""books keyset index
+
+Revision ID: 26f76985352c
+Revises: f166cf6ee71c
+Create Date: 2026-01-12 10:14:03.512847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '26f76985352c'
+down_revision: Union[str, None] = 'f166cf6ee71c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_books_created_at_id', 'books', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_books_created_at_id', table_name='books')
@@ -0,0 +1,29 @@
+"""users updated at
+
+Revision ID: 7d47248c73da
+Revises: 98bfe9e62531
+Create Date: 2026-03-16 14:08:42.517306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d47248c73da'
+down_revision: Union[str, None] = '98bfe9e62531'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing profiles count as last changed when they were created
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.execute("UPDATE users SET updated_at = created_at")
+    op.alter_column('users', 'updated_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'updated_at')
@@ -0,0 +1,80 @@
+"""query shaped indexes
+
+Revision ID: 98bfe9e62531
+Revises: f98fbe0d6cc0
+Create Date: 2026-03-02 10:41:17.264830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '98bfe9e62531'
+down_revision: Union[str, None] = 'f98fbe0d6cc0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+APPROVED = sa.text("status = 'APPROVED'")
+
+# Indexes on primary keys duplicate the primary key index
+PRIMARY_KEY_INDEXES = [
+    ('ix_users_id', 'users'),
+    ('ix_categories_id', 'categories'),
+    ('ix_languages_id', 'languages'),
+    ('ix_books_id', 'books'),
+    ('ix_likes_id', 'likes'),
+]
+
+# Replaced by the query shaped indexes below, or never usable: ilike '%term%'
+# filters can't use btree indexes on title/author/location (the trigram
+# indexes serve those), and status alone is far too unselective.
+REPLACED_INDEXES = [
+    ('ix_books_title', 'books', ['title']),
+    ('ix_books_author', 'books', ['author']),
+    ('ix_books_location', 'books', ['location']),
+    ('ix_books_status', 'books', ['status']),
+    ('ix_books_created_at', 'books', ['created_at']),
+    ('ix_books_seller_id', 'books', ['seller_id']),
+    ('ix_books_created_at_id', 'books', ['created_at', 'id']),
+    ('ix_books_like_count_id', 'books', ['like_count', 'id']),
+    ('ix_likes_user_id', 'likes', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    # GET /books: optional equality filter, then the sort key, approved books only
+    op.create_index('ix_books_approved_created_at_id', 'books',
+                    [sa.text('created_at DESC'), sa.text('id DESC')], postgresql_where=APPROVED)
+    op.create_index('ix_books_approved_category_created_at_id', 'books',
+                    ['category_id', sa.text('created_at DESC'), sa.text('id DESC')], postgresql_where=APPROVED)
+    op.create_index('ix_books_approved_language_created_at_id', 'books',
+                    ['language_id', sa.text('created_at DESC'), sa.text('id DESC')], postgresql_where=APPROVED)
+    op.create_index('ix_books_approved_like_count_id', 'books',
+                    [sa.text('like_count DESC'), sa.text('id DESC')], postgresql_where=APPROVED)
+    op.create_index('ix_books_approved_price', 'books', ['price'], postgresql_where=APPROVED)
+    # GET /users/me/listings and GET /users/me/saved
+    op.create_index('ix_books_seller_id_created_at', 'books', ['seller_id', sa.text('created_at DESC')])
+    op.create_index('ix_likes_user_id_created_at', 'likes', ['user_id', sa.text('created_at DESC')])
+
+    for name, table in PRIMARY_KEY_INDEXES:
+        op.drop_index(name, table_name=table)
+    for name, table, _ in REPLACED_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, columns in REPLACED_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    for name, table in PRIMARY_KEY_INDEXES:
+        op.create_index(name, table, ['id'], unique=False)
+
+    op.drop_index('ix_likes_user_id_created_at', table_name='likes')
+    op.drop_index('ix_books_seller_id_created_at', table_name='books')
+    op.drop_index('ix_books_approved_price', table_name='books')
+    op.drop_index('ix_books_approved_like_count_id', table_name='books')
+    op.drop_index('ix_books_approved_language_created_at_id', table_name='books')
+    op.drop_index('ix_books_approved_category_created_at_id', table_name='books')
+    op.drop_index('ix_books_approved_created_at_id', table_name='books')
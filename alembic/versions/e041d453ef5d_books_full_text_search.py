@@ -0,0 +1,47 @@
+"""books full text search
+
+Revision ID: e041d453ef5d
+Revises: 26f76985352c
+Create Date: 2026-01-19 15:42:37.201934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e041d453ef5d'
+down_revision: Union[str, None] = '26f76985352c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated column, so Postgres keeps it in sync on every insert/update
+    op.execute("""
+        ALTER TABLE books ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(author, '')), 'B')
+        ) STORED
+    """)
+    op.create_index('ix_books_search_vector', 'books', ['search_vector'], unique=False, postgresql_using='gin')
+
+    op.create_index('ix_books_title_trgm', 'books', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_books_author_trgm', 'books', ['author'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'author': 'gin_trgm_ops'})
+    op.create_index('ix_books_location_trgm', 'books', ['location'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'location': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_books_location_trgm', table_name='books')
+    op.drop_index('ix_books_author_trgm', table_name='books')
+    op.drop_index('ix_books_title_trgm', table_name='books')
+    op.drop_index('ix_books_search_vector', table_name='books')
+    op.drop_column('books', 'search_vector')
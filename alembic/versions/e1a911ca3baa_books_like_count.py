@@ -0,0 +1,33 @@
+"""books like count
+
+Revision ID: e1a911ca3baa
+Revises: e041d453ef5d
+Create Date: 2026-02-03 09:27:51.884106
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a911ca3baa'
+down_revision: Union[str, None] = 'e041d453ef5d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('books', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE books SET like_count = counts.like_count
+        FROM (SELECT book_id, count(*) AS like_count FROM likes GROUP BY book_id) AS counts
+        WHERE books.id = counts.book_id
+    """)
+    op.create_index('ix_books_like_count_id', 'books', ['like_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_books_like_count_id', table_name='books')
+    op.drop_column('books', 'like_count')
@@ -0,0 +1,33 @@
+"""users role
+
+Revision ID: f98fbe0d6cc0
+Revises: e1a911ca3baa
+Create Date: 2026-02-17 14:08:32.517093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f98fbe0d6cc0'
+down_revision: Union[str, None] = 'e1a911ca3baa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+userrole = sa.Enum('USER', 'MODERATOR', 'ADMIN', name='userrole')
+
+
+def upgrade() -> None:
+    userrole.create(op.get_bind(), checkfirst=True)
+    op.add_column('users', sa.Column('role', userrole, server_default='USER', nullable=False))
+    # The moderation queue reads pending books oldest first
+    op.create_index('ix_books_status_created_at_id', 'books', ['status', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_books_status_created_at_id', table_name='books')
+    op.drop_column('users', 'role')
+    userrole.drop(op.get_bind(), checkfirst=True)
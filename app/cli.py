@@ -0,0 +1,109 @@
+"""Maintenance commands.
+
+    python -m app.cli calibrate-hash --target-ms 250
+    python -m app.cli reconcile-likes
+    python -m app.cli set-role someone@example.com moderator
+    python -m app.cli profile-header GET /api/v1/books
+    python -m app.cli init-sqlite
+"""
+import argparse
+import asyncio
+
+from app.config import settings
+
+
+def calibrate_hash(args: argparse.Namespace) -> None:
+    from app.utils.security import calibrate_bcrypt_rounds, measure_hash_seconds
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms)
+    seconds = measure_hash_seconds(rounds)
+    print(f"BCRYPT_ROUNDS={rounds}  # one hash takes {seconds * 1000:.0f} ms on this machine")
+
+
+def reconcile_likes(args: argparse.Namespace) -> None:
+    from app.database import AsyncSessionLocal
+    from app.utils.like_counts import reconcile_like_counts
+
+    async def run() -> int:
+        async with AsyncSessionLocal() as db:
+            return await reconcile_like_counts(db, args.batch_size)
+
+    print(f"Corrected like_count on {asyncio.run(run())} books")
+
+
+def set_role(args: argparse.Namespace) -> None:
+    from sqlalchemy import update
+    from app.database import AsyncSessionLocal
+    from app.models.user import User, UserRole
+
+    async def run() -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(User).where(User.email == args.email).values(role=UserRole(args.role))
+            )
+            await db.commit()
+            return result.rowcount
+
+    if not asyncio.run(run()):
+        raise SystemExit(f"No user with email {args.email}")
+    print(f"{args.email} is now {args.role}")
+
+
+def profile_header(args: argparse.Namespace) -> None:
+    from app.utils.profiling import sign_profile_request
+
+    if not settings.PROFILE_SECRET:
+        raise SystemExit("PROFILE_SECRET is not set")
+    print(f"X-Profile: {sign_profile_request(settings.PROFILE_SECRET, args.method, args.path)}")
+
+
+def init_sqlite(args: argparse.Namespace) -> None:
+    from app.models import User, Book, Category, Like, Language  # noqa: F401 - registers the tables
+    from app.database import Base, engine
+    from app.utils.search import search_backend
+
+    if engine.dialect.name != "sqlite":
+        raise SystemExit("DATABASE_URL is not a SQLite database; use alembic upgrade head")
+
+    async def run() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(search_backend.install)
+            await conn.run_sync(search_backend.check)
+        await engine.dispose()
+
+    asyncio.run(run())
+    print(f"Created the tables and the full-text index in {settings.DATABASE_URL}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    calibrate = commands.add_parser("calibrate-hash", help="Pick a bcrypt cost for a target hash time")
+    calibrate.add_argument("--target-ms", type=float, default=settings.PASSWORD_HASH_TARGET_MS)
+    calibrate.set_defaults(handler=calibrate_hash)
+
+    reconcile = commands.add_parser("reconcile-likes", help="Re-derive books.like_count from likes")
+    reconcile.add_argument("--batch-size", type=int, default=10_000)
+    reconcile.set_defaults(handler=reconcile_likes)
+
+    role = commands.add_parser("set-role", help="Change a user's role")
+    role.add_argument("email")
+    role.add_argument("role", choices=["user", "moderator", "admin"])
+    role.set_defaults(handler=set_role)
+
+    profile = commands.add_parser("profile-header", help="Signed X-Profile header for one request (valid 5 minutes)")
+    profile.add_argument("method")
+    profile.add_argument("path", help="Request path without the query string, e.g. /api/v1/books")
+    profile.set_defaults(handler=profile_header)
+
+    sqlite = commands.add_parser("init-sqlite", help="Create the schema and search index in a SQLite database")
+    sqlite.set_defaults(handler=init_sqlite)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
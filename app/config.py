@@ -5,16 +5,79 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DB_ECHO: bool = False  # Log every SQL statement
+    # Pool sizes are per worker process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # Seconds; -1 disables
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection; 0 for pgbouncer
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10_000
+    
+    # Per-user liked book ids, used for is_liked
+    LIKED_BOOKS_CACHE_TTL_SECONDS: int = 30
+    LIKED_BOOKS_CACHE_MAX_ENTRIES: int = 10_000
+    LIKED_BOOKS_CACHE_MAX_SET_SIZE: int = 1000
+    
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    # Fixed bcrypt cost; when unset, passlib's default unless calibration is enabled.
+    # With several workers prefer a fixed value (see `python -m app.cli calibrate-hash`)
+    # so they all agree and logins don't rehash back and forth.
+    BCRYPT_ROUNDS: Optional[int] = None
+    PASSWORD_HASH_CALIBRATE_ON_STARTUP: bool = False
+    PASSWORD_HASH_TARGET_MS: float = 250
     
     # App
     DEBUG: bool = True
     PROJECT_NAME: str = "Kitobchi"
     API_V1_PREFIX: str = "/api/v1"
+    ADMIN_EMAILS: list[str] = []  # JSON list, e.g. ["admin@example.com"]
+    METRICS_ENABLED: bool = True  # Per-route latency and SQL statement metrics on /metrics
+    # Enforce @query_budget statement limits: "off", "log" or "raise" (dev/test)
+    QUERY_BUDGET_MODE: str = "off"
+    
+    # Request profiling: requests with a signed X-Profile header (needs PROFILE_SECRET)
+    # or a random PROFILE_SAMPLE_RATE share of them run under cProfile
+    PROFILE_SECRET: Optional[str] = None
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 50
+    
+    # Listing totals
+    COUNT_CACHE_TTL_SECONDS: int = 30
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+    COUNT_ESTIMATE_THRESHOLD: int = 1000  # Below this an estimate is replaced by an exact count
+    
+    # Public listing response cache: "memory" or "none"
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_TTL_SECONDS: int = 15
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    
+    # GET /books/facets: upper bounds of the price ranges; the last range is open
+    PRICE_FACET_BOUNDS: list[float] = [25, 50, 100, 200]
+    
+    # Categories/languages cache
+    REFERENCE_DATA_TTL_SECONDS: int = 300
+    
+    # POST /books/bulk
+    BULK_IMPORT_CHUNK_SIZE: int = 500  # Rows per transaction
+    BULK_IMPORT_MAX_ROWS: int = 50_000
+    # GET /books/export: rows fetched per round trip of the server-side cursor
+    EXPORT_YIELD_PER: int = 1000
+    
+    # Autocomplete
+    SUGGEST_MAX_BOOKS: int = 500_000
+    # Reload interval, picks up books approved or changed in other workers (0 disables)
+    SUGGEST_REFRESH_SECONDS: int = 300
     
     class Config:
         env_file = ".env"
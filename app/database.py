@@ -1,12 +1,91 @@
+import time
+from typing import Dict
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.utils.metrics import record_statement
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait and how often they time out.
+
+    Only checkouts that block on the queue are timed, so opening a connection
+    below capacity does not count as waiting.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _must_wait(self) -> bool:
+        """Nothing idle and no overflow left to open a new connection with"""
+        return self.checkedin() == 0 and -1 < self._max_overflow <= self.overflow()
+
+    def _do_get(self):
+        if not self._must_wait():
+            self.checkouts += 1
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+
+def engine_options() -> dict:
+    """create_async_engine keyword arguments from settings"""
+    options = {"echo": settings.DB_ECHO, "future": True}
+    if settings.DATABASE_URL.startswith("sqlite"):
+        # Local/offline runs: keep SQLAlchemy's default pool for SQLite
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if "+asyncpg" in settings.DATABASE_URL:
+        options["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_options())
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    context.metrics_started_at = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    # Counted towards the current request, see MetricsMiddleware
+    record_statement(time.perf_counter() - context.metrics_started_at, statement)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -19,6 +98,14 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+def pool_stats() -> Dict[str, float]:
+    """Connection pool usage of this process"""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"status": pool.status()}
+
+
 async def get_db() -> AsyncSession:
     """Dependency for getting database session"""
     async with AsyncSessionLocal() as session:
@@ -26,5 +113,3 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
-
-
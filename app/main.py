@@ -1,8 +1,15 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routers import auth, books, users, likes, categories, languages
-from app.database import engine, Base
+from app.routers import auth, books, users, likes, categories, languages, moderation, profiles
+from app.database import engine, Base, AsyncSessionLocal, pool_stats
+from app.utils.suggest import suggest_index
+from app.utils.response_cache import response_cache
+from app.utils.reference_data import reference_data
+from app.utils.security import password_hash_pool, configure_password_hashing
+from app.utils.metrics import MetricsMiddleware, metrics_registry, gauge_lines
+from app.utils.profiling import ProfilingMiddleware
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -21,6 +28,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.PROFILE_SECRET or settings.PROFILE_SAMPLE_RATE:
+    app.add_middleware(
+        ProfilingMiddleware, secret=settings.PROFILE_SECRET, sample_rate=settings.PROFILE_SAMPLE_RATE
+    )
+
+if settings.METRICS_ENABLED or settings.QUERY_BUDGET_MODE != "off":
+    app.add_middleware(MetricsMiddleware, budget_mode=settings.QUERY_BUDGET_MODE)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(books.router, prefix=settings.API_V1_PREFIX)
@@ -28,14 +43,32 @@ app.include_router(users.router, prefix=settings.API_V1_PREFIX)
 app.include_router(likes.router, prefix=settings.API_V1_PREFIX)
 app.include_router(categories.router, prefix=settings.API_V1_PREFIX)
 app.include_router(languages.router, prefix=settings.API_V1_PREFIX)
+app.include_router(moderation.router, prefix=settings.API_V1_PREFIX)
+app.include_router(profiles.router, prefix=settings.API_V1_PREFIX)
 
 
 @app.on_event("startup")
 async def startup():
     """Initialize database on startup"""
+    configure_password_hashing()
     # Note: In production, use Alembic migrations instead
     # async with engine.begin() as conn:
     #     await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await reference_data.reload(db)
+        await suggest_index.load(db)
+    if settings.SUGGEST_REFRESH_SECONDS > 0:
+        app.state.suggest_refresh = asyncio.create_task(
+            suggest_index.refresh_periodically(AsyncSessionLocal, settings.SUGGEST_REFRESH_SECONDS)
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background tasks"""
+    task = getattr(app.state, "suggest_refresh", None)
+    if task is not None:
+        task.cancel()
 
 
 @app.get("/")
@@ -53,3 +86,22 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+
+@app.get("/stats")
+async def stats():
+    """In-process cache and worker pool statistics"""
+    return {
+        "response_cache": response_cache.stats(),
+        "password_hash_pool": password_hash_pool.stats(),
+        "db_pool": pool_stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker process"""
+    lines = [metrics_registry.render()]
+    lines += gauge_lines("db_pool", "Connection pool usage.", pool_stats())
+    lines += gauge_lines("response_cache", "Listing response cache counters.", response_cache.stats())
+    lines += gauge_lines("password_hash_pool", "Password hashing pool usage.", password_hash_pool.stats())
+    return Response(content="\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
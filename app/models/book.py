@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Enum, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Enum, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -19,35 +19,64 @@ class ListingStatus(str, enum.Enum):
 class Book(Base):
     __tablename__ = "books"
     
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(255), nullable=False, index=True)
-    author = Column(String(255), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    title = Column(String(255), nullable=False)
+    author = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     
     # Images stored as JSON array of URLs
     images = Column(JSON, nullable=False, default=list)
     
     # Foreign keys
-    seller_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    seller_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True, index=True)
     language_id = Column(Integer, ForeignKey("languages.id", ondelete="SET NULL"), nullable=True, index=True)
     
     # Listing details
     listing_type = Column(Enum(ListingType), nullable=False, default=ListingType.SELL)
     price = Column(Float, nullable=True)  # Nullable if free
-    location = Column(String(255), nullable=True, index=True)
+    location = Column(String(255), nullable=True)
     
     # Status
-    status = Column(Enum(ListingStatus), nullable=False, default=ListingStatus.PENDING, index=True)
+    status = Column(Enum(ListingStatus), nullable=False, default=ListingStatus.PENDING)
+    
+    # Denormalized number of likes, kept in step by the likes router
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     seller = relationship("User", back_populates="books")
     category = relationship("Category", back_populates="books")
     language = relationship("Language", back_populates="books")
-    likes = relationship("Like", back_populates="book", cascade="all, delete-orphan")
+    # The likes foreign key cascades in the database, no need to load them on delete
+    likes = relationship("Like", back_populates="book", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        # Public listings only ever read approved books, so their indexes are
+        # partial. Each matches one query shape of GET /books: an optional
+        # equality filter followed by the sort key.
+        Index("ix_books_approved_created_at_id", created_at.desc(), id.desc(),
+              postgresql_where=status == ListingStatus.APPROVED),
+        Index("ix_books_approved_category_created_at_id", category_id, created_at.desc(), id.desc(),
+              postgresql_where=status == ListingStatus.APPROVED),
+        Index("ix_books_approved_language_created_at_id", language_id, created_at.desc(), id.desc(),
+              postgresql_where=status == ListingStatus.APPROVED),
+        Index("ix_books_approved_like_count_id", like_count.desc(), id.desc(),
+              postgresql_where=status == ListingStatus.APPROVED),
+        Index("ix_books_approved_price", price,
+              postgresql_where=status == ListingStatus.APPROVED),
+        # Seller's own listings, newest first
+        Index("ix_books_seller_id_created_at", seller_id, created_at.desc()),
+        # Moderation queue, oldest pending first
+        Index("ix_books_status_created_at_id", status, created_at, id),
+        # Trigram indexes serve ilike '%term%' filters. The search_vector column
+        # and its GIN index are Postgres-only and live in the migrations.
+        Index("ix_books_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_books_author_trgm", "author", postgresql_using="gin", postgresql_ops={"author": "gin_trgm_ops"}),
+        Index("ix_books_location_trgm", "location", postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}),
+    )
 
 
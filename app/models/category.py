@@ -6,7 +6,7 @@ from app.database import Base
 class Category(Base):
     __tablename__ = "categories"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), unique=True, nullable=False, index=True)
     slug = Column(String(100), unique=True, nullable=False, index=True)
     
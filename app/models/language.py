@@ -6,7 +6,7 @@ from app.database import Base
 class Language(Base):
     __tablename__ = "languages"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(50), unique=True, nullable=False, index=True)
     code = Column(String(10), unique=True, nullable=False, index=True)
     
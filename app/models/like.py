@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -7,13 +7,17 @@ from app.database import Base
 class Like(Base):
     __tablename__ = "likes"
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     book_id = Column(Integer, ForeignKey("books.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
-    # Ensure one like per user per book
-    __table_args__ = (UniqueConstraint("user_id", "book_id", name="unique_user_book_like"),)
+    __table_args__ = (
+        # Ensure one like per user per book
+        UniqueConstraint("user_id", "book_id", name="unique_user_book_like"),
+        # Saved books, newest like first
+        Index("ix_likes_user_id_created_at", user_id, created_at.desc()),
+    )
     
     # Relationships
     user = relationship("User", back_populates="likes")
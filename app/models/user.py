@@ -1,13 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+import enum
 from app.database import Base
 
 
+class UserRole(str, enum.Enum):
+    USER = "user"
+    MODERATOR = "moderator"  # Approves/rejects listings
+    ADMIN = "admin"
+
+
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
     password = Column(String(255), nullable=False)  # hashed
     first_name = Column(String(100), nullable=True)
@@ -16,7 +23,10 @@ class User(Base):
     telegram_username = Column(String(100), nullable=True)
     avatar_url = Column(String(500), nullable=True)
     bio = Column(Text, nullable=True)
+    role = Column(Enum(UserRole), nullable=False, default=UserRole.USER, server_default=UserRole.USER.name)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Part of the book detail ETag, which embeds the seller profile
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     books = relationship("Book", back_populates="seller", cascade="all, delete-orphan")
@@ -5,7 +5,10 @@ from app.database import get_db
 from app.models.user import User
 from app.schemas.auth import RegisterRequest, LoginRequest, Token
 from app.schemas.user import UserResponse
-from app.utils.security import verify_password, get_password_hash, create_access_token
+from app.utils.security import (
+    verify_and_update_password_async, get_password_hash_async, create_access_token, PasswordHashPoolBusy
+)
+from app.utils.query_budget import query_budget
 from datetime import timedelta
 from app.config import settings
 from sqlalchemy.exc import IntegrityError
@@ -13,7 +16,17 @@ from fastapi import HTTPException, status
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(2)
 async def register(
     user_data: RegisterRequest,
     db: AsyncSession = Depends(get_db)
@@ -21,7 +34,9 @@ async def register(
     clean_password = user_data.password.strip()
     
     try:
-        hashed_password = get_password_hash(clean_password)
+        hashed_password = await get_password_hash_async(clean_password)
+    except PasswordHashPoolBusy:
+        raise _hashing_busy()
     except ValueError:
         raise HTTPException(
             status_code=422,
@@ -57,6 +72,7 @@ async def register(
         )
 
 @router.post("/login", response_model=Token)
+@query_budget(2)
 async def login(
     login_data: LoginRequest,
     db: AsyncSession = Depends(get_db)
@@ -67,19 +83,33 @@ async def login(
     )
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(login_data.password, user.password):
+    password_ok, new_hash = False, None
+    try:
+        if user is not None:
+            password_ok, new_hash = await verify_and_update_password_async(
+                login_data.password, user.password
+            )
+    except PasswordHashPoolBusy:
+        raise _hashing_busy()
+
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Hash uses an outdated cost: store it with the current one
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
+
     # Token yaratamiz
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": user.email, "uid": user.id},
         expires_delta=access_token_expires
     )
 
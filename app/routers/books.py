@@ -1,117 +1,160 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_
-from sqlalchemy.orm import selectinload
-from typing import Optional
-from app.database import get_db
+from sqlalchemy import select
+from typing import AsyncIterator, Optional
+from datetime import datetime
+from app.database import get_db, AsyncSessionLocal
 from app.models.book import Book, ListingType, ListingStatus
 from app.models.user import User
 from app.models.category import Category
 from app.models.language import Language
 from app.models.like import Like
 from app.schemas.book import (
-    BookCreate, BookUpdate, BookResponse, BookDetail, BookListResponse, BookFilterParams
+    BookCreate, BookUpdate, BookResponse, BookDetail, BookListResponse, BookFilterParams,
+    BookSuggestion, BookImportResponse, BookFacets
 )
-from app.schemas.user import UserProfile
-from app.schemas.category import CategoryResponse
-from app.utils.dependencies import get_current_active_user
-from app.models.user import User as UserModel
+from app.utils.dependencies import get_current_principal, get_optional_principal
+from app.utils.principals import Principal
+from app.utils.pagination import encode_cursor
+from app.utils.filters import filter_key
+from app.utils.listings import orders_by_relevance, public_books_page, public_books_query, sort_key
+from app.utils.counts import resolve_total, count_cache
+from app.utils.book_events import BookState, book_changed
+from app.utils.suggest import suggest_index
+from app.utils.response_cache import response_cache, listing_tags, listing_versions
+from app.utils.etag import make_etag, version_etag, etag_matches, validator_headers, not_modified
+from app.utils.reference_data import reference_data
+from app.utils.liked_books import liked_book_ids
+from app.utils.bulk_import import BookImporter, UnsupportedImportFormat, iter_rows
+from app.utils.facets import facet_counts
+from app.utils.query_budget import query_budget
+from app.utils.serialization import (
+    BOOK_COLUMNS, BOOK_DETAIL_COLUMNS, book_serializer, book_detail_serializer, book_list,
+    dumps, loads, json_response
+)
+from app.config import settings
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
 
+async def _with_is_liked(db: AsyncSession, body: bytes, principal: Optional[Principal]) -> bytes:
+    """Annotate a shared (anonymous) list body with the caller's likes"""
+    if principal is None:
+        return body
+    data = loads(body)
+    liked = await liked_book_ids(db, principal.id, (item["id"] for item in data["items"]))
+    for item in data["items"]:
+        item["is_liked"] = item["id"] in liked
+    return dumps(data)
+
+
+def _list_response(
+    body: bytes, etag: Optional[str], if_none_match: Optional[str], principal: Optional[Principal]
+) -> Response:
+    """Send a list body, or 304 if the caller has it already"""
+    if etag is None:
+        etag = make_etag(body)
+        if etag_matches(if_none_match, etag):
+            return not_modified(validator_headers(etag, private=principal is not None))
+    headers = validator_headers(etag, private=principal is not None)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("", response_model=BookListResponse)
+@query_budget(4)
 async def get_books(
     params: BookFilterParams = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    principal: Optional[Principal] = Depends(get_optional_principal),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get all books with filtering, search, and pagination"""
-    # Start building query - only show approved books for public
-    query = select(Book).where(Book.status == ListingStatus.APPROVED)
-    
-    # Apply filters
-    if params.category_id:
-        query = query.where(Book.category_id == params.category_id)
-    
-    if params.language_id:
-        query = query.where(Book.language_id == params.language_id)
-    
-    if params.listing_type:
-        query = query.where(Book.listing_type == params.listing_type)
-    
-    if params.min_price is not None:
-        query = query.where(Book.price >= params.min_price)
-    
-    if params.max_price is not None:
-        query = query.where(Book.price <= params.max_price)
-    
-    if params.author:
-        query = query.where(Book.author.ilike(f"%{params.author}%"))
-    
-    if params.location:
-        query = query.where(Book.location.ilike(f"%{params.location}%"))
-    
-    if params.search:
-        search_term = f"%{params.search}%"
-        query = query.where(
-            or_(
-                Book.title.ilike(search_term),
-                Book.author.ilike(search_term)
-            )
-        )
-    
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    cache_key = (
+        "books", filter_key(params), params.order_by, params.cursor,
+        params.page, params.page_size, params.total_mode
+    )
+    tags = listing_tags(params.category_id, params.language_id)
+    
+    # Anonymous bodies only change with the listing's version, so their ETag is
+    # known before anything is loaded. Callers' bodies carry is_liked and are hashed.
+    etag = None
+    if principal is None:
+        etag = version_etag(cache_key, listing_versions.version(tags), listing_versions.bucket())
+        if etag_matches(if_none_match, etag):
+            return not_modified(validator_headers(etag, private=False))
+    
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        body = await _with_is_liked(db, cached, principal)
+        return _list_response(body, etag, if_none_match, principal)
+    
+    # Plain columns rather than Book entities: the rows are only serialized
+    query = public_books_query(params)
+    
+    # Get total count (cached per normalized filter)
+    total, total_is_exact = await resolve_total(
+        db, query, ("books", None, filter_key(params)), params.total_mode
+    )
     
-    # Apply pagination
-    offset = (params.page - 1) * params.page_size
-    query = query.order_by(Book.created_at.desc())
-    query = query.offset(offset).limit(params.page_size)
+    query = public_books_page(query, params)
     
     # Execute query
     result = await db.execute(query)
-    books = result.scalars().all()
+    books = [book_serializer.from_row(row) for row in result]
+    
+    next_cursor = None
+    if len(books) > params.page_size:
+        books = books[:params.page_size]
+        if not orders_by_relevance(params):
+            last = books[-1]
+            sort_columns, _ = sort_key(params)
+            next_cursor = encode_cursor(
+                params.order_by.value, *(last[column.key] for column in sort_columns)
+            )
     
     # Calculate total pages
-    total_pages = (total + params.page_size - 1) // params.page_size
+    total_pages = None
+    if total is not None:
+        total_pages = (total + params.page_size - 1) // params.page_size
     
-    return BookListResponse(
+    # Rows are trusted, so skip BookListResponse validation (it still documents the route)
+    body = dumps(book_list(
         items=books,
         total=total,
+        total_is_exact=total_is_exact,
         page=params.page,
         page_size=params.page_size,
-        total_pages=total_pages
-    )
+        total_pages=total_pages,
+        next_cursor=next_cursor
+    ))
+    response_cache.set(cache_key, body, tags)
+    
+    body = await _with_is_liked(db, body, principal)
+    return _list_response(body, etag, if_none_match, principal)
 
 
 @router.post("", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(4)
 async def create_book(
     book_data: BookCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new book listing"""
     # Validate category if provided
-    if book_data.category_id:
-        result = await db.execute(select(Category).where(Category.id == book_data.category_id))
-        category = result.scalar_one_or_none()
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
-            )
+    if book_data.category_id and not await reference_data.categories.exists(db, book_data.category_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
     
     # Validate language if provided
-    if book_data.language_id:
-        result = await db.execute(select(Language).where(Language.id == book_data.language_id))
-        language = result.scalar_one_or_none()
-        if not language:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Language not found"
-            )
+    if book_data.language_id and not await reference_data.languages.exists(db, book_data.language_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Language not found"
+        )
     
     # Create book
     new_book = Book(
@@ -124,68 +167,195 @@ async def create_book(
     await db.commit()
     await db.refresh(new_book)
     
+    book_changed(None, BookState.from_book(new_book))
+    
     return new_book
 
 
+@router.post("/bulk", response_model=BookImportResponse)
+async def bulk_create_books(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Import many book listings from a streamed NDJSON or CSV body.
+
+    Rows are validated and inserted in chunks of BULK_IMPORT_CHUNK_SIZE, each
+    in its own transaction; invalid rows are reported and skipped.
+    """
+    try:
+        rows = iter_rows(request.stream(), request.headers.get("content-type", ""))
+    except UnsupportedImportFormat:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv"
+        )
+    
+    importer = BookImporter(db, current_user.id)
+    await importer.run(rows)
+    
+    if importer.created:
+        # New listings are pending, so only the seller's own totals change
+        count_cache.invalidate("listings", current_user.id)
+    
+    return BookImportResponse(
+        created=importer.created,
+        failed=len(importer.errors),
+        errors=importer.errors
+    )
+
+
+async def _export_lines(since: Optional[datetime]) -> AsyncIterator[bytes]:
+    # The session lives as long as the response is streamed, not the request
+    async with AsyncSessionLocal() as db:
+        query = select(*BOOK_COLUMNS).where(Book.status == ListingStatus.APPROVED)
+        if since is not None:
+            query = query.where(Book.updated_at >= since)
+        rows = await db.stream(
+            query.order_by(Book.id).execution_options(yield_per=settings.EXPORT_YIELD_PER)
+        )
+        async for row in rows:
+            book = book_serializer.from_row(row)
+            del book["is_liked"]
+            yield dumps(book) + b"\n"
+
+
+@router.get("/export")
+@query_budget(1)
+async def export_books(
+    since: Optional[datetime] = Query(None, description="Only books updated at or after this time")
+):
+    """Stream all approved books as NDJSON, ordered by id"""
+    return StreamingResponse(_export_lines(since), media_type="application/x-ndjson")
+
+
+@router.get("/suggest", response_model=list[BookSuggestion])
+@query_budget(0)
+async def suggest_books(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20)
+):
+    """Title/author autocomplete served from the in-memory index"""
+    return [
+        BookSuggestion(id=book_id, title=title, author=author)
+        for book_id, title, author in suggest_index.suggest(q, limit)
+    ]
+
+
+@router.get("/facets", response_model=BookFacets)
+@query_budget(1)
+async def get_book_facets(
+    params: BookFilterParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Counts per category, language, listing type and price range for the current filters.
+
+    Each facet is counted without its own filters. Pagination and ordering
+    parameters are ignored.
+    """
+    cache_key = ("facets", filter_key(params), tuple(settings.PRICE_FACET_BOUNDS))
+    # The category and language facets count books outside the filtered ones
+    tags = listing_tags(None, None)
+    etag = version_etag(cache_key, listing_versions.version(tags), listing_versions.bucket())
+    headers = validator_headers(etag, private=False)
+    if etag_matches(if_none_match, etag):
+        return not_modified(headers)
+    
+    body = response_cache.get(cache_key)
+    if body is None:
+        query = select(Book.id).where(Book.status == ListingStatus.APPROVED)
+        body = dumps(await facet_counts(db, query, params, settings.PRICE_FACET_BOUNDS))
+        response_cache.set(cache_key, body, tags)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _is_liked(db: AsyncSession, book_id: int, principal: Optional[Principal]) -> bool:
+    """Whether the caller liked the book (false for unauthenticated users)"""
+    if principal is None:
+        return False
+    return book_id in await liked_book_ids(db, principal.id, [book_id])
+
+
+def _detail_etag(
+    book_id: int, updated_at: datetime, like_count: int, seller_updated_at: datetime, is_liked: bool
+) -> str:
+    """ETag of a book detail from everything its body is built from.
+
+    Likes keep updated_at as it is, hence like_count; category and language
+    names come from the reference data, call reference_data.ensure_fresh first.
+    """
+    return version_etag(
+        "book", book_id, updated_at, like_count, seller_updated_at, is_liked,
+        reference_data.categories.etag, reference_data.languages.etag
+    )
+
+
 @router.get("/{book_id}", response_model=BookDetail)
+@query_budget(6)
 async def get_book_detail(
     book_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    principal: Optional[Principal] = Depends(get_optional_principal),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Get book detail with seller information"""
-    # Load book with relationships
-    query = select(Book).options(
-        selectinload(Book.seller),
-        selectinload(Book.category),
-        selectinload(Book.language)
-    ).where(Book.id == book_id)
+    # Both ETags below include the reference data's, which expire
+    await reference_data.ensure_fresh(db)
+    is_liked = None
+    if if_none_match:
+        # Revalidation: a primary key lookup of the version columns, the
+        # detail itself is only loaded when it changed
+        result = await db.execute(
+            select(Book.updated_at, Book.like_count, User.updated_at)
+            .join(User, Book.seller_id == User.id)
+            .where(Book.id == book_id)
+        )
+        version = result.first()
+        if version is not None:
+            updated_at, like_count, seller_updated_at = version
+            is_liked = await _is_liked(db, book_id, principal)
+            etag = _detail_etag(book_id, updated_at, like_count, seller_updated_at, is_liked)
+            if etag_matches(if_none_match, etag):
+                return not_modified(validator_headers(etag, private=principal is not None))
+    
+    # One round trip: the seller, category and language come joined in as plain columns
+    query = (
+        select(*BOOK_DETAIL_COLUMNS, User.updated_at)
+        .select_from(Book)
+        .join(User, Book.seller_id == User.id)
+        .outerjoin(Category, Book.category_id == Category.id)
+        .outerjoin(Language, Book.language_id == Language.id)
+        .where(Book.id == book_id)
+    )
     
     result = await db.execute(query)
-    book = result.scalar_one_or_none()
+    row = result.first()
     
-    if not book:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
         )
     
-    # Check if user liked this book (will be false for unauthenticated users)
-    is_liked = False
-    
-    # Build response using model_validate for proper serialization
-    from app.schemas.book import LanguageResponse
-    
-    # Create response dict
-    book_dict = {
-        "id": book.id,
-        "title": book.title,
-        "author": book.author,
-        "description": book.description,
-        "images": book.images,
-        "category_id": book.category_id,
-        "language_id": book.language_id,
-        "listing_type": book.listing_type,
-        "price": book.price,
-        "location": book.location,
-        "seller_id": book.seller_id,
-        "status": book.status,
-        "created_at": book.created_at,
-        "updated_at": book.updated_at,
-        "seller": UserProfile.model_validate(book.seller),
-        "category": CategoryResponse.model_validate(book.category) if book.category else None,
-        "language": LanguageResponse.model_validate(book.language) if book.language else None,
-        "is_liked": is_liked
-    }
-    
-    return BookDetail(**book_dict)
+    if is_liked is None:
+        is_liked = await _is_liked(db, book_id, principal)
+    
+    book = book_detail_serializer.from_row(row, is_liked=is_liked)
+    seller_updated_at = row[-1]
+    etag = _detail_etag(book_id, book["updated_at"], book["like_count"], seller_updated_at, is_liked)
+    # No Last-Modified: likes move like_count and is_liked without touching
+    # updated_at, so only the ETag can tell whether the body changed
+    return json_response(book, headers=validator_headers(etag, private=principal is not None))
 
 
 @router.put("/{book_id}", response_model=BookResponse)
+@query_budget(3)
 async def update_book(
     book_id: int,
     book_data: BookUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update a book listing (only by owner)"""
     result = await db.execute(select(Book).where(Book.id == book_id))
@@ -203,6 +373,15 @@ async def update_book(
             detail="Not authorized to update this book"
         )
     
+    # Owners may resubmit a listing for review; approving and rejecting is up to moderators
+    if book_data.status not in (None, book.status, ListingStatus.PENDING):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only moderators can approve or reject listings"
+        )
+    
+    before = BookState.from_book(book)
+    
     # Update fields
     update_data = book_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -211,14 +390,17 @@ async def update_book(
     await db.commit()
     await db.refresh(book)
     
+    book_changed(before, BookState.from_book(book))
+    
     return book
 
 
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(2)
 async def delete_book(
     book_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Delete a book listing (only by owner)"""
     result = await db.execute(select(Book).where(Book.id == book_id))
@@ -236,8 +418,12 @@ async def delete_book(
             detail="Not authorized to delete this book"
         )
     
+    before = BookState.from_book(book)
+    
     await db.delete(book)
     await db.commit()
     
+    book_changed(before, None)
+    
     return None
 
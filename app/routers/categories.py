@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from app.database import get_db
-from app.models.category import Category
+from app.models.user import User
 from app.schemas.category import CategoryResponse
+from app.utils.dependencies import get_current_admin_user
+from app.utils.reference_data import reference_data
+from app.utils.query_budget import query_budget
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.get("", response_model=list[CategoryResponse])
+@query_budget(1)
 async def get_categories(
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all categories"""
-    result = await db.execute(select(Category).order_by(Category.name))
-    categories = result.scalars().all()
-    return categories
+    await reference_data.categories.ensure_fresh(db)
+    return reference_data.categories.response(if_none_match)
 
 
+@router.post("/reload", status_code=status.HTTP_204_NO_CONTENT)
+async def reload_categories(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Reload cached categories after they were changed in the database (admin only)"""
+    await reference_data.categories.reload(db)
+    return None
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from app.database import get_db
-from app.models.language import Language
+from app.models.user import User
 from app.schemas.book import LanguageResponse
+from app.utils.dependencies import get_current_admin_user
+from app.utils.reference_data import reference_data
+from app.utils.query_budget import query_budget
 
 router = APIRouter(prefix="/languages", tags=["Languages"])
 
 
 @router.get("", response_model=list[LanguageResponse])
+@query_budget(1)
 async def get_languages(
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all languages"""
-    result = await db.execute(select(Language).order_by(Language.name))
-    languages = result.scalars().all()
-    return languages
+    await reference_data.languages.ensure_fresh(db)
+    return reference_data.languages.response(if_none_match)
 
 
+@router.post("/reload", status_code=status.HTTP_204_NO_CONTENT)
+async def reload_languages(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Reload cached languages after they were changed in the database (admin only)"""
+    await reference_data.languages.reload(db)
+    return None
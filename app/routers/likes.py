@@ -1,91 +1,248 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import case, select, update, delete, literal, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict, List, Optional
 from app.database import get_db
-from app.models.user import User
 from app.models.book import Book
 from app.models.like import Like
-from app.schemas.like import LikeCreate, LikeResponse
-from app.schemas.book import BookResponse
-from app.utils.dependencies import get_current_active_user
+from app.schemas.like import LikeCreate, LikeResponse, LikeBatchRequest, LikeBatchResponse
+from app.utils.book_events import like_counts_changed
+from app.utils.dependencies import get_current_principal
+from app.utils.principals import Principal
+from app.utils.counts import count_cache
+from app.utils.liked_books import liked_books_cache
+from app.utils.query_budget import query_budget
+from app.utils.serialization import BOOK_COLUMNS, book_serializer, json_response
 
 router = APIRouter(prefix="/likes", tags=["Likes"])
 
+books = Book.__table__
+
+
+def _like_response(book_row, like_id: int, user_id: int, liked_at) -> Dict[str, Any]:
+    """A LikeResponse body; book_row starts with BOOK_COLUMNS"""
+    book = book_serializer.from_row(book_row[:len(BOOK_COLUMNS)], is_liked=True)
+    return {
+        "id": like_id,
+        "user_id": user_id,
+        "book_id": book["id"],
+        "created_at": liked_at,
+        "book": book,
+    }
+
+
+def _is_sqlite(db: AsyncSession) -> bool:
+    # SQLite has no data-modifying CTEs; its paths take one statement per table
+    return db.bind.dialect.name == "sqlite"
+
+
+async def _insert_like(db: AsyncSession, user_id: int, book_id: int) -> Optional[Dict[str, Any]]:
+    """Insert the like and bump the counter in one statement; None if already liked.
+
+    The unique constraint decides whether the like is new, the foreign key
+    whether the book exists.
+    """
+    inserted = (
+        pg_insert(Like)
+        .values(user_id=user_id, book_id=book_id)
+        .on_conflict_do_nothing(constraint="unique_user_book_like")
+        .returning(Like.id, Like.user_id, Like.book_id, Like.created_at)
+        .cte("inserted")
+    )
+    try:
+        result = await db.execute(
+            update(books)
+            .where(books.c.id == inserted.c.book_id)
+            .values(like_count=books.c.like_count + 1, updated_at=books.c.updated_at)
+            .returning(
+                *BOOK_COLUMNS,
+                inserted.c.id.label("like_id"),
+                inserted.c.user_id,
+                inserted.c.created_at.label("liked_at")
+            )
+        )
+        row = result.one_or_none()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
+        )
+    if row is None:
+        return None
+    return _like_response(row, row.like_id, row.user_id, row.liked_at)
+
+
+async def _insert_like_sqlite(db: AsyncSession, user_id: int, book_id: int) -> Optional[Dict[str, Any]]:
+    """_insert_like in two statements. The like is selected from the book
+    row, as SQLite may not enforce the foreign key."""
+    like = (await db.execute(
+        sqlite_insert(Like)
+        .from_select(["user_id", "book_id"], select(literal(user_id), books.c.id).where(books.c.id == book_id))
+        .on_conflict_do_nothing(index_elements=["user_id", "book_id"])
+        .returning(Like.id, Like.created_at)
+    )).one_or_none()
+    if like is None:
+        return None
+    row = (await db.execute(
+        update(books)
+        .where(books.c.id == book_id)
+        .values(like_count=books.c.like_count + 1, updated_at=books.c.updated_at)
+        .returning(*BOOK_COLUMNS)
+    )).one()
+    await db.commit()
+    return _like_response(row, like.id, user_id, like.created_at)
+
 
 @router.post("", response_model=LikeResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(2)
 async def like_book(
     like_data: LikeCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Like a book"""
-    # Check if book exists
-    result = await db.execute(select(Book).where(Book.id == like_data.book_id))
-    book = result.scalar_one_or_none()
-    
-    if not book:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Book not found"
-        )
+    """Like a book (idempotent: liking again returns the existing like with 200)"""
+    insert_like = _insert_like_sqlite if _is_sqlite(db) else _insert_like
+    like = await insert_like(db, current_user.id, like_data.book_id)
     
-    # Check if already liked
-    existing_like = await db.execute(
-        select(Like).where(
-            and_(Like.user_id == current_user.id, Like.book_id == like_data.book_id)
-        )
-    )
-    if existing_like.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Book already liked"
+    if like is None:
+        # Already liked, or (on SQLite) the book does not exist
+        result = await db.execute(
+            select(
+                *BOOK_COLUMNS,
+                Like.id.label("like_id"),
+                Like.user_id,
+                Like.created_at.label("liked_at")
+            )
+            .join(Like, Like.book_id == books.c.id)
+            .where(Like.user_id == current_user.id, Like.book_id == like_data.book_id)
         )
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Book not found"
+            )
+        return json_response(_like_response(row, row.like_id, row.user_id, row.liked_at))
     
-    # Create like
-    new_like = Like(
-        user_id=current_user.id,
-        book_id=like_data.book_id
-    )
-    
-    db.add(new_like)
-    await db.commit()
-    await db.refresh(new_like)
-    
-    # Load book for response
-    await db.refresh(new_like, ["book"])
-    
-    return LikeResponse(
-        id=new_like.id,
-        user_id=new_like.user_id,
-        book_id=new_like.book_id,
-        created_at=new_like.created_at,
-        book=BookResponse.model_validate(book)
-    )
+    count_cache.invalidate("saved", current_user.id)
+    liked_books_cache.update(current_user.id, liked=[like_data.book_id])
+    book = like["book"]
+    like_counts_changed([(book["status"], book["category_id"], book["language_id"])])
+    return json_response(like, status_code=status.HTTP_201_CREATED)
 
 
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(1, sqlite=2)
 async def unlike_book(
     book_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Unlike a book"""
-    result = await db.execute(
-        select(Like).where(
-            and_(Like.user_id == current_user.id, Like.book_id == book_id)
-        )
+    delete_like = delete(Like).where(Like.user_id == current_user.id, Like.book_id == book_id)
+    decrement = (
+        update(books)
+        .values(like_count=books.c.like_count - 1, updated_at=books.c.updated_at)
+        .returning(books.c.status, books.c.category_id, books.c.language_id)
     )
-    like = result.scalar_one_or_none()
+    if _is_sqlite(db):
+        deleted = (await db.execute(delete_like.returning(Like.book_id))).one_or_none()
+        unliked = None
+        if deleted is not None:
+            unliked = (await db.execute(decrement.where(books.c.id == book_id))).one_or_none()
+    else:
+        deleted = delete_like.returning(Like.book_id).cte("deleted")
+        result = await db.execute(decrement.where(books.c.id == deleted.c.book_id))
+        unliked = result.one_or_none()
+    await db.commit()
     
-    if not like:
+    if unliked is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Like not found"
         )
     
-    await db.delete(like)
-    await db.commit()
+    count_cache.invalidate("saved", current_user.id)
+    liked_books_cache.update(current_user.id, unliked=[book_id])
+    like_counts_changed([tuple(unliked)])
     
     return None
 
 
+async def _toggle_likes_sqlite(db: AsyncSession, insert_likes, delete_likes) -> List[tuple]:
+    """The batch statement as an insert, a delete and one counter update; the
+    same rows, (book id, delta, status, category id, language id) per changed book"""
+    inserted = (await db.execute(
+        sqlite_insert(Like)
+        .from_select(["user_id", "book_id"], insert_likes)
+        .on_conflict_do_nothing(index_elements=["user_id", "book_id"])
+        .returning(Like.book_id)
+    )).scalars().all()
+    deleted = (await db.execute(delete_likes.returning(Like.book_id))).scalars().all()
+    deltas = {**dict.fromkeys(inserted, 1), **dict.fromkeys(deleted, -1)}
+    if not deltas:
+        return []
+    result = await db.execute(
+        update(books)
+        .where(books.c.id.in_(deltas))
+        .values(like_count=books.c.like_count + case(deltas, value=books.c.id), updated_at=books.c.updated_at)
+        .returning(books.c.id, books.c.status, books.c.category_id, books.c.language_id)
+    )
+    return [(book_id, deltas[book_id], *book) for book_id, *book in result]
+
+
+@router.post("/batch", response_model=LikeBatchResponse)
+@query_budget(1, sqlite=3)
+async def toggle_likes(
+    batch: LikeBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Apply many like/unlike toggles in one statement, e.g. to sync offline state.
+
+    The last toggle per book wins. Toggles that change nothing (liking a
+    liked book, unliking a book that is not liked, unknown books) are skipped.
+    """
+    desired = {toggle.book_id: toggle.liked for toggle in batch.toggles}
+    like_ids = [book_id for book_id, liked in desired.items() if liked]
+    unlike_ids = [book_id for book_id, liked in desired.items() if not liked]
+    
+    insert_likes = select(literal(current_user.id), books.c.id).where(books.c.id.in_(like_ids))
+    delete_likes = delete(Like).where(Like.user_id == current_user.id, Like.book_id.in_(unlike_ids))
+    if _is_sqlite(db):
+        changes = await _toggle_likes_sqlite(db, insert_likes, delete_likes)
+    else:
+        inserted = (
+            pg_insert(Like)
+            .from_select(["user_id", "book_id"], insert_likes)
+            .on_conflict_do_nothing(constraint="unique_user_book_like")
+            .returning(Like.book_id)
+            .cte("inserted")
+        )
+        deleted = delete_likes.returning(Like.book_id).cte("deleted")
+        deltas = union_all(
+            select(inserted.c.book_id, literal(1).label("delta")),
+            select(deleted.c.book_id, literal(-1).label("delta")),
+        ).cte("deltas")
+        result = await db.execute(
+            update(books)
+            .where(books.c.id == deltas.c.book_id)
+            .values(like_count=books.c.like_count + deltas.c.delta, updated_at=books.c.updated_at)
+            .returning(books.c.id, deltas.c.delta, books.c.status, books.c.category_id, books.c.language_id)
+        )
+        changes = result.all()
+    await db.commit()
+    
+    liked = sorted(book_id for book_id, delta, *_ in changes if delta > 0)
+    unliked = sorted(book_id for book_id, delta, *_ in changes if delta < 0)
+    if changes:
+        count_cache.invalidate("saved", current_user.id)
+        liked_books_cache.update(current_user.id, liked=liked, unliked=unliked)
+        like_counts_changed(tuple(book) for _, _, *book in changes)
+    
+    return LikeBatchResponse(liked=liked, unliked=unliked)
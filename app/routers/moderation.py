@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from typing import Optional
+from app.database import get_db
+from app.models.book import Book
+from app.models.user import User
+from app.schemas.moderation import (
+    ModerationQueueResponse, ModerationDecisionRequest, ModerationDecisionResponse
+)
+from app.utils.dependencies import get_current_moderator
+from app.utils.pagination import encode_cursor
+from app.utils.listings import moderation_queue_page
+from app.utils.book_events import BookState, book_changed
+from app.utils.query_budget import query_budget
+
+router = APIRouter(prefix="/moderation", tags=["Moderation"])
+
+
+@router.get("/queue", response_model=ModerationQueueResponse)
+@query_budget(2)
+async def get_pending_books(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    moderator: User = Depends(get_current_moderator)
+):
+    """Get pending books, oldest first"""
+    result = await db.execute(moderation_queue_page(limit, cursor))
+    books = result.scalars().all()
+    
+    next_cursor = None
+    if len(books) > limit:
+        books = books[:limit]
+        next_cursor = encode_cursor("queue", books[-1].created_at, books[-1].id)
+    
+    return ModerationQueueResponse(items=books, next_cursor=next_cursor)
+
+
+@router.post("/decisions", response_model=ModerationDecisionResponse)
+@query_budget(2, sqlite=3)
+async def decide_books(
+    decisions: ModerationDecisionRequest,
+    db: AsyncSession = Depends(get_db),
+    moderator: User = Depends(get_current_moderator)
+):
+    """Approve or reject many books in one statement (two on SQLite)"""
+    new_status = decisions.decision.status
+    book_ids = sorted(set(decisions.book_ids))
+    
+    changing = (Book.id.in_(book_ids), Book.status != new_status)
+    changed_columns = (Book.id, Book.seller_id, Book.title, Book.author, Book.category_id, Book.language_id)
+    if db.bind.dialect.name == "sqlite":
+        # RETURNING can't read the FROM clause there: the previous statuses come first
+        previous = dict((await db.execute(select(Book.id, Book.status).where(*changing))).all())
+        rows = []
+        if previous:
+            result = await db.execute(
+                update(Book)
+                .where(Book.id.in_(previous))
+                .values(status=new_status)
+                .returning(*changed_columns)
+            )
+            rows = [(*row, previous[row.id]) for row in result]
+    else:
+        # Lock the rows to read their previous status, which decides what to invalidate
+        previous = select(Book.id, Book.status).where(*changing).with_for_update().subquery()
+        result = await db.execute(
+            update(Book)
+            .where(Book.id == previous.c.id)
+            .values(status=new_status)
+            .returning(*changed_columns, previous.c.status)
+        )
+        rows = result.all()
+    await db.commit()
+    
+    for book_id, seller_id, title, author, category_id, language_id, previous_status in rows:
+        after = BookState(
+            id=book_id,
+            seller_id=seller_id,
+            title=title,
+            author=author,
+            status=new_status,
+            category_id=category_id,
+            language_id=language_id,
+        )
+        book_changed(after._replace(status=previous_status), after)
+    
+    updated = sorted(row[0] for row in rows)
+    return ModerationDecisionResponse(
+        updated=updated,
+        skipped=sorted(set(book_ids) - set(updated))
+    )
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from app.models.user import User
+from app.schemas.profile import ProfileInfo
+from app.utils.dependencies import get_current_admin_user
+from app.utils.profiling import profile_store
+
+router = APIRouter(prefix="/profiles", tags=["Profiles"])
+
+
+@router.get("", response_model=list[ProfileInfo])
+async def list_profiles(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """List saved request profiles, newest first (admin only)"""
+    return profile_store.list()
+
+
+@router.get("/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Download a profile in pstats format (admin only)"""
+    path = profile_store.path(profile_id)
+    if path is None or not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
-from sqlalchemy.orm import selectinload
 from typing import Optional
 from app.database import get_db
 from app.models.user import User
-from app.models.book import Book, ListingStatus
-from app.models.like import Like
-from app.schemas.user import UserResponse, UserUpdate, UserProfile
-from app.schemas.book import BookResponse, BookListResponse
-from app.utils.dependencies import get_current_active_user
+from app.models.book import ListingStatus
+from app.schemas.user import UserUpdate, UserProfile
+from app.schemas.book import BookListResponse, TotalMode
+from app.utils.dependencies import get_current_active_user, get_current_principal
+from app.utils.principals import Principal, principal_cache
+from app.utils.counts import resolve_total
+from app.utils.liked_books import liked_book_ids
+from app.utils.query_budget import query_budget
+from app.utils.listings import saved_books_page, saved_books_query, seller_listings_page, seller_listings_query
+from app.utils.serialization import book_serializer, book_list, json_response
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/me", response_model=UserProfile)
+@query_budget(1)
 async def get_my_profile(
     current_user: User = Depends(get_current_active_user)
 ):
@@ -23,6 +27,7 @@ async def get_my_profile(
 
 
 @router.put("/me", response_model=UserProfile)
+@query_budget(3)
 async def update_my_profile(
     user_data: UserUpdate,
     db: AsyncSession = Depends(get_db),
@@ -35,84 +40,92 @@ async def update_my_profile(
     
     await db.commit()
     await db.refresh(current_user)
+    principal_cache.invalidate_user(current_user.id)
     
     return current_user
 
 
 @router.get("/me/listings", response_model=BookListResponse)
+@query_budget(4)
 async def get_my_listings(
     status_filter: Optional[ListingStatus] = Query(None, description="Filter by status"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    total_mode: TotalMode = Query(TotalMode.EXACT),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get current user's book listings"""
-    query = select(Book).where(Book.seller_id == current_user.id)
-    
-    if status_filter:
-        query = query.where(Book.status == status_filter)
+    query = seller_listings_query(current_user.id, status_filter)
     
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total, total_is_exact = await resolve_total(
+        db, query, ("listings", current_user.id, (status_filter,)), total_mode
+    )
     
     # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.order_by(Book.created_at.desc())
-    query = query.offset(offset).limit(page_size)
+    query = seller_listings_page(query, page, page_size)
     
     # Execute query
     result = await db.execute(query)
-    books = result.scalars().all()
+    books = [book_serializer.from_row(row) for row in result]
     
     # Calculate total pages
-    total_pages = (total + page_size - 1) // page_size
+    total_pages = None
+    if total is not None:
+        total_pages = (total + page_size - 1) // page_size
+    
+    liked = await liked_book_ids(db, current_user.id, (book["id"] for book in books))
+    for book in books:
+        book["is_liked"] = book["id"] in liked
     
-    return BookListResponse(
+    return json_response(book_list(
         items=books,
         total=total,
+        total_is_exact=total_is_exact,
         page=page,
         page_size=page_size,
         total_pages=total_pages
-    )
+    ))
 
 
 @router.get("/me/saved", response_model=BookListResponse)
+@query_budget(2)
 async def get_saved_books(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    total_mode: TotalMode = Query(TotalMode.EXACT),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get current user's saved/liked books"""
     # Query books that user has liked
-    query = select(Book).join(Like).where(Like.user_id == current_user.id)
+    query = saved_books_query(current_user.id)
     
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    total, total_is_exact = await resolve_total(
+        db, query, ("saved", current_user.id, ()), total_mode
+    )
     
     # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.order_by(Like.created_at.desc())
-    query = query.offset(offset).limit(page_size)
+    query = saved_books_page(query, page, page_size)
     
     # Execute query
     result = await db.execute(query)
-    books = result.scalars().all()
+    books = [book_serializer.from_row(row, is_liked=True) for row in result]
     
     # Calculate total pages
-    total_pages = (total + page_size - 1) // page_size
+    total_pages = None
+    if total is not None:
+        total_pages = (total + page_size - 1) // page_size
     
-    return BookListResponse(
+    return json_response(book_list(
         items=books,
         total=total,
+        total_is_exact=total_is_exact,
         page=page,
         page_size=page_size,
         total_pages=total_pages
-    )
+    ))
 
 
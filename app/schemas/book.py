@@ -1,9 +1,22 @@
 from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List
 from datetime import datetime
+import enum
 from app.models.book import ListingType, ListingStatus
 
 
+class BookOrdering(str, enum.Enum):
+    NEWEST = "newest"
+    RELEVANCE = "relevance"  # Only meaningful together with search
+    POPULAR = "popular"  # Most liked first
+
+
+class TotalMode(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
 class BookBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
     author: str = Field(..., min_length=1, max_length=255)
@@ -53,6 +66,8 @@ class BookResponse(BookBase):
     id: int
     seller_id: int
     status: ListingStatus
+    like_count: int = 0
+    is_liked: Optional[bool] = None  # Only set for authenticated callers
     created_at: datetime
     updated_at: datetime
     
@@ -74,10 +89,58 @@ class BookDetail(BookResponse):
 class BookListResponse(BaseModel):
     """Response for book list with pagination"""
     items: List[BookResponse]
-    total: int
+    total: Optional[int]
+    total_is_exact: bool = True
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class BookImportError(BaseModel):
+    """Why a row of a bulk import was skipped"""
+    row: int
+    errors: List[str]
+
+
+class BookImportResponse(BaseModel):
+    created: int
+    failed: int
+    errors: List[BookImportError]
+
+
+class BookSuggestion(BaseModel):
+    """Autocomplete entry"""
+    id: int
+    title: str
+    author: str
+
+
+class FacetCount(BaseModel):
+    """Number of matching books in one category or language"""
+    id: int
+    count: int
+
+
+class ListingTypeCount(BaseModel):
+    listing_type: ListingType
+    count: int
+
+
+class PriceRangeCount(BaseModel):
+    """Matching books priced in [min, max); max is None for the last range"""
+    min: float
+    max: Optional[float]
+    count: int
+
+
+class BookFacets(BaseModel):
+    """Counts for the filter sidebar, over the books matching the current filters"""
+    total: int
+    categories: List[FacetCount]
+    languages: List[FacetCount]
+    listing_types: List[ListingTypeCount]
+    price_ranges: List[PriceRangeCount]
 
 
 class BookFilterParams(BaseModel):
@@ -92,6 +155,9 @@ class BookFilterParams(BaseModel):
     location: Optional[str] = None
     page: int = Field(1, ge=1)
     page_size: int = Field(10, ge=1, le=100)
+    order_by: BookOrdering = BookOrdering.NEWEST
+    cursor: Optional[str] = None  # Keyset pagination, takes precedence over page
+    total_mode: TotalMode = TotalMode.EXACT
 
 
 # Forward references
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List
 from app.schemas.book import BookResponse
 
 
@@ -18,3 +19,18 @@ class LikeResponse(BaseModel):
         from_attributes = True
 
 
+
+
+class LikeToggle(BaseModel):
+    book_id: int
+    liked: bool
+
+
+class LikeBatchRequest(BaseModel):
+    toggles: List[LikeToggle] = Field(..., min_length=1, max_length=500)
+
+
+class LikeBatchResponse(BaseModel):
+    """Books whose like state actually changed"""
+    liked: List[int]
+    unliked: List[int]
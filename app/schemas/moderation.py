@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import enum
+from app.models.book import ListingStatus
+from app.schemas.book import BookResponse
+
+
+class ModerationDecision(str, enum.Enum):
+    APPROVE = "approve"
+    REJECT = "reject"
+    
+    @property
+    def status(self) -> ListingStatus:
+        return ListingStatus.APPROVED if self is ModerationDecision.APPROVE else ListingStatus.REJECTED
+
+
+class ModerationQueueResponse(BaseModel):
+    """Pending books, oldest first"""
+    items: List[BookResponse]
+    next_cursor: Optional[str] = None
+
+
+class ModerationDecisionRequest(BaseModel):
+    book_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    decision: ModerationDecision
+
+
+class ModerationDecisionResponse(BaseModel):
+    updated: List[int]
+    skipped: List[int]  # Unknown ids and books that already had the decided status
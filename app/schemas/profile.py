@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import datetime
+
+
+class ProfileInfo(BaseModel):
+    """Metadata of a saved request profile"""
+    id: str
+    created_at: datetime
+    trigger: str  # "header" or "sample"
+    method: str
+    route: Optional[str] = None
+    path: str
+    params: Dict[str, str]
+    status_code: int
+    duration_ms: float
+    sql_statements: Optional[int] = None
+    sql_ms: Optional[float] = None
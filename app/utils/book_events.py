@@ -0,0 +1,71 @@
+from typing import Iterable, NamedTuple, Optional, Tuple
+from app.models.book import Book, ListingStatus
+from app.utils.counts import count_cache
+from app.utils.response_cache import response_cache, listing_versions, book_tag_groups
+from app.utils.suggest import suggest_index
+
+
+class BookState(NamedTuple):
+    """The fields of a book that in-process caches and indexes depend on"""
+    id: int
+    seller_id: int
+    title: str
+    author: str
+    status: ListingStatus
+    category_id: Optional[int]
+    language_id: Optional[int]
+
+    @classmethod
+    def from_book(cls, book: Book) -> "BookState":
+        return cls(
+            id=book.id,
+            seller_id=book.seller_id,
+            title=book.title,
+            author=book.author,
+            status=book.status,
+            category_id=book.category_id,
+            language_id=book.language_id,
+        )
+
+    @property
+    def is_public(self) -> bool:
+        return self.status == ListingStatus.APPROVED
+
+
+def book_changed(before: Optional[BookState], after: Optional[BookState]) -> None:
+    """Propagate a committed create (before=None), update or delete (after=None).
+
+    Call after the commit succeeded, so nothing is invalidated for a write that
+    rolled back.
+    """
+    current = after or before
+    count_cache.invalidate("listings", current.seller_id)
+    if (before and before.is_public) or (after and after.is_public):
+        count_cache.invalidate("books")
+    for state in (before, after):
+        if state is not None and state.is_public:
+            tag_groups = book_tag_groups(state.category_id, state.language_id)
+            response_cache.invalidate(*tag_groups)
+            listing_versions.bump(*tag_groups)
+    if after is None:
+        # Likes cascade with the book, so saved totals change as well
+        count_cache.invalidate("saved")
+
+    if after is not None and after.is_public:
+        if before != after:
+            suggest_index.add(after.id, after.title, after.author)
+    elif before is not None:
+        suggest_index.remove(before.id)
+
+
+def like_counts_changed(books: Iterable[Tuple[ListingStatus, Optional[int], Optional[int]]]) -> None:
+    """Propagate committed like count changes, per book (status, category_id, language_id).
+
+    like_count is in listing bodies and orders the popular sort, so the
+    listings a public book appears in change as they do on an update.
+    """
+    for status, category_id, language_id in set(books):
+        if status == ListingStatus.APPROVED:
+            tag_groups = book_tag_groups(category_id, language_id)
+            response_cache.invalidate(*tag_groups)
+            listing_versions.bump(*tag_groups)
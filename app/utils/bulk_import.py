@@ -0,0 +1,182 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.book import Book, ListingStatus
+from app.schemas.book import BookCreate, BookImportError
+from app.utils.reference_data import reference_data
+
+NDJSON_TYPES = {"application/x-ndjson", "application/jsonl", "application/json-seq"}
+CSV_TYPES = {"text/csv", "application/csv"}
+
+# Separator of image URLs inside a CSV cell
+CSV_LIST_SEPARATOR = "|"
+MAX_LINE_LENGTH = 64 * 1024
+
+# (row number, parsed row, parse error)
+Row = Tuple[int, Optional[dict], Optional[str]]
+
+
+class UnsupportedImportFormat(ValueError):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed UTF-8 body into lines without reading it whole"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+        if len(pending) > MAX_LINE_LENGTH:
+            raise ValueError(f"Line longer than {MAX_LINE_LENGTH} characters")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Row]:
+    number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line), None
+        except ValueError:
+            yield number, None, "Invalid JSON"
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[Row]:
+    """Rows of a CSV with a header line; empty cells are left out"""
+    header: Optional[List[str]] = None
+    record: List[str] = []
+    number = 0
+    async for line in lines:
+        record.append(line)
+        text = "\n".join(record)
+        if text.count('"') % 2:
+            # A quoted field continues on the next line
+            if len(text) > MAX_LINE_LENGTH:
+                raise ValueError(f"Record longer than {MAX_LINE_LENGTH} characters")
+            continue
+        record = []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        number += 1
+        if len(values) != len(header):
+            yield number, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        row = {name: value for name, value in zip(header, values) if value != ""}
+        if "images" in row:
+            row["images"] = [url.strip() for url in row["images"].split(CSV_LIST_SEPARATOR) if url.strip()]
+        yield number, row, None
+    if record:
+        yield number + 1, None, "Unterminated quoted field"
+
+
+def iter_rows(chunks: AsyncIterator[bytes], content_type: str) -> AsyncIterator[Row]:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in NDJSON_TYPES:
+        return iter_ndjson_rows(iter_lines(chunks))
+    if media_type in CSV_TYPES:
+        return iter_csv_rows(iter_lines(chunks))
+    raise UnsupportedImportFormat(media_type)
+
+
+def _validation_messages(error: ValidationError) -> List[str]:
+    messages = []
+    for detail in error.errors():
+        location = ".".join(str(part) for part in detail["loc"])
+        messages.append(f"{location}: {detail['msg']}" if location else detail["msg"])
+    return messages
+
+
+class BookImporter:
+    """Validates streamed rows and inserts them in chunks, one transaction each.
+
+    Rows that fail validation are reported and skipped; the rest of their
+    chunk is still imported.
+    """
+
+    def __init__(self, db: AsyncSession, seller_id: int):
+        self.db = db
+        self.seller_id = seller_id
+        self.created = 0
+        self.errors: List[BookImportError] = []
+        self._chunk: List[Tuple[int, BookCreate]] = []
+
+    def _fail(self, row: int, *messages: str) -> None:
+        self.errors.append(BookImportError(row=row, errors=list(messages)))
+
+    async def run(self, rows: AsyncIterator[Row]) -> None:
+        number = 0
+        try:
+            async for number, data, error in rows:
+                if number > settings.BULK_IMPORT_MAX_ROWS:
+                    self._fail(number, f"Row limit of {settings.BULK_IMPORT_MAX_ROWS} reached, the remaining rows were not imported")
+                    break
+                if error is not None:
+                    self._fail(number, error)
+                    continue
+                try:
+                    self._chunk.append((number, BookCreate.model_validate(data)))
+                except ValidationError as exc:
+                    self._fail(number, *_validation_messages(exc))
+                    continue
+                if len(self._chunk) >= settings.BULK_IMPORT_CHUNK_SIZE:
+                    await self._flush()
+        except ValueError as exc:
+            # Malformed stream (bad encoding, overlong line); rows read so far are kept
+            self._fail(number + 1, f"{exc}, the remaining rows were not imported")
+        await self._flush()
+
+    async def _flush(self) -> None:
+        chunk, self._chunk = self._chunk, []
+        if not chunk:
+            return
+
+        missing_categories = await reference_data.categories.missing(
+            self.db, {book.category_id for _, book in chunk if book.category_id}
+        )
+        missing_languages = await reference_data.languages.missing(
+            self.db, {book.language_id for _, book in chunk if book.language_id}
+        )
+        valid: List[Tuple[int, Dict]] = []
+        for number, book in chunk:
+            messages = []
+            if book.category_id in missing_categories:
+                messages.append("category_id: Category not found")
+            if book.language_id in missing_languages:
+                messages.append("language_id: Language not found")
+            if messages:
+                self._fail(number, *messages)
+                continue
+            valid.append((number, {
+                **book.model_dump(),
+                "seller_id": self.seller_id,
+                "status": ListingStatus.PENDING,
+            }))
+        if not valid:
+            return
+
+        try:
+            await self.db.execute(insert(Book), [values for _, values in valid])
+            await self.db.commit()
+        except DBAPIError:
+            await self.db.rollback()
+            for number, _ in valid:
+                self._fail(number, "Could not be saved")
+            return
+        self.created += len(valid)
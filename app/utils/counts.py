@@ -0,0 +1,108 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.config import settings
+from app.schemas.book import TotalMode
+
+
+class CountCache:
+    """TTL + LRU cache of listing totals.
+
+    Keys are (scope, owner, filter_key) tuples, e.g. ("books", None, (...)) for
+    the public listing or ("listings", user_id, (...)) for a user's own books.
+    The cache is per process: writes invalidate it locally and the TTL bounds
+    how stale other workers can get.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, bool]]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[Tuple[int, bool]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, total, exact = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return total, exact
+
+    def set(self, key: Tuple, total: int, exact: bool) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, total, exact)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, scope: Optional[str] = None, owner: Optional[Hashable] = None) -> None:
+        """Drop cached totals for a scope (and owner), or everything"""
+        if scope is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == scope and (owner is None or k[1] == owner)]:
+            del self._entries[key]
+
+
+count_cache = CountCache(
+    ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+)
+
+
+def count_query(query: Select) -> Select:
+    """select count(*) over the filtered query"""
+    return select(func.count()).select_from(query.subquery())
+
+
+async def exact_count(db: AsyncSession, query: Select) -> int:
+    result = await db.execute(count_query(query))
+    return result.scalar()
+
+
+async def estimate_count(db: AsyncSession, query: Select) -> Optional[int]:
+    """Row estimate from the PostgreSQL planner, None on other databases"""
+    dialect = db.bind.dialect
+    if dialect.name != "postgresql":
+        return None
+    sql = str(query.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    # Sent as-is so user search terms are never parsed as bind parameters
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def resolve_total(
+    db: AsyncSession,
+    query: Select,
+    key: Tuple,
+    mode: TotalMode = TotalMode.EXACT
+) -> Tuple[Optional[int], bool]:
+    """Return (total, is_exact) for a listing query according to total_mode"""
+    if mode == TotalMode.NONE:
+        return None, False
+
+    cached = count_cache.get(key)
+    if cached is not None:
+        total, exact = cached
+        if exact or mode == TotalMode.ESTIMATE:
+            return total, exact
+
+    if mode == TotalMode.ESTIMATE:
+        estimate = await estimate_count(db, query)
+        # Small result sets are cheap to count exactly and estimates are worst there
+        if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+            count_cache.set(key, estimate, False)
+            return estimate, False
+
+    total = await exact_count(db, query)
+    count_cache.set(key, total, True)
+    return total, True
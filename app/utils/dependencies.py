@@ -4,33 +4,88 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.utils.security import decode_access_token
+from app.utils.principals import Principal, principal_cache
+from app.config import settings
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-    
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
 
-    token = credentials.credentials
+
+async def _resolve_principal(token: str, db: AsyncSession) -> Optional[Principal]:
+    """Caller of a bearer token, or None if the token is not valid.
+
+    Tokens carry the user id ("uid"), so no query is needed; older tokens
+    with only the email are resolved once and then served from the cache.
+
+    The trade-off: a uid token stays valid for routes that only need the
+    Principal until it expires (ACCESS_TOKEN_EXPIRE_MINUTES), even if the
+    user row is gone. Routes that load the User (get_current_user) still
+    reject it. Code that removes a user must also call
+    principal_cache.invalidate_user, but that only drops cached email
+    lookups; cutting off uid tokens early needs a revocation check here.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     payload = decode_access_token(token)
+    if payload is None:
+        return None
 
     email: Optional[str] = payload.get("sub")
+    user_id: Optional[int] = payload.get("uid")
     if email is None:
-        raise credentials_exception
+        return None
+
+    if user_id is None:
+        result = await db.execute(select(User.id).where(User.email == email))
+        user_id = result.scalar_one_or_none()
+        if user_id is None:
+            return None
+
+    principal = Principal(id=user_id, email=email)
+    principal_cache.set(token, principal, payload.get("exp"))
+    return principal
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """Authenticated caller without loading the User row"""
+    principal = await _resolve_principal(credentials.credentials, db)
+    if principal is None:
+        raise _credentials_exception()
+    return principal
+
 
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+async def get_optional_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[Principal]:
+    """Caller of public endpoints; anonymous (None) without a valid token"""
+    if credentials is None:
+        return None
+    return await _resolve_principal(credentials.credentials, db)
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    user = await db.get(User, principal.id)
 
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     return user
 
@@ -39,3 +94,30 @@ async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     return current_user
+
+
+def _is_admin(user: User) -> bool:
+    # ADMIN_EMAILS bootstraps the first admins before any role is assigned
+    return user.role == UserRole.ADMIN or user.email in settings.ADMIN_EMAILS
+
+
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_active_user)
+) -> User:
+    if not _is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
+
+
+async def get_current_moderator(
+    current_user: User = Depends(get_current_active_user)
+) -> User:
+    if current_user.role != UserRole.MODERATOR and not _is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Moderator privileges required",
+        )
+    return current_user
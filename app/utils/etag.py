@@ -0,0 +1,49 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional
+from fastapi import Response, status
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def version_etag(*parts) -> str:
+    """Strong ETag from the values a body is built from, without building it.
+
+    Parts must be values with a stable repr (ids, timestamps, counters, enums).
+    """
+    return f'"{hashlib.sha1(repr(parts).encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value covers the given ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def validator_headers(etag: str, private: bool, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """ETag and friends for a response clients should revalidate before reusing.
+
+    Bodies that depend on the caller (is_liked) are private, so shared caches
+    don't hand them to someone else. Only pass last_modified when that date
+    moves with every value the body is built from. Naive datetimes (SQLite)
+    are taken as UTC.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache" if private else "no-cache"}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
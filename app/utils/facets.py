@@ -0,0 +1,147 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, case, func, literal, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select, Subquery
+from app.models.book import Book
+from app.schemas.book import BookFilterParams
+from app.utils.filters import apply_book_filters, filter_conditions
+
+# The facets, in the order of their grouping sets
+FACETS = ("category", "language", "listing_type", "price_range")
+
+# The filters that select values of each facet. A facet is counted without
+# its own filters (disjunctive facets), so a sidebar with a category picked
+# still shows how many books the other categories have.
+FACET_FILTERS = {
+    "category": ("category_id",),
+    "language": ("language_id",),
+    "listing_type": ("listing_type",),
+    "price_range": ("min_price", "max_price"),
+}
+
+
+def price_range(bounds: Sequence[float]) -> ColumnElement:
+    """Index of the price range a book falls in, NULL for books without a price"""
+    whens = [(Book.price.is_(None), None)]
+    whens += [(Book.price < bound, index) for index, bound in enumerate(bounds)]
+    return case(*whens, else_=len(bounds))
+
+
+def _facet_columns(bounds: Sequence[float]) -> Dict[str, ColumnElement]:
+    return {
+        "category": Book.category_id,
+        "language": Book.language_id,
+        "listing_type": Book.listing_type,
+        "price_range": price_range(bounds),
+    }
+
+
+def _facet_rows(
+    query: Select, params: BookFilterParams, bounds: Sequence[float]
+) -> Tuple[Subquery, Dict[Optional[str], List[ColumnElement]]]:
+    """The books to count, with the facet values and whether each facet's own filters hold.
+
+    The query keeps only the filters that no facet drops. Returns the subquery
+    and, per facet and for the total (None), the conditions its count needs.
+    """
+    conditions = filter_conditions(params)
+    own_filters = [name for names in FACET_FILTERS.values() for name in names]
+    query = apply_book_filters(query, params, exclude=own_filters)
+    columns = [column.label(name) for name, column in _facet_columns(bounds).items()]
+    for facet, names in FACET_FILTERS.items():
+        own = [conditions[name] for name in names if name in conditions]
+        if own:
+            columns.append(and_(*own).label(f"{facet}_filter"))
+    inner = query.with_only_columns(*columns).subquery()
+    flags = {facet: inner.c[f"{facet}_filter"] for facet in FACETS if f"{facet}_filter" in inner.c}
+    counted = {
+        grouped: [flag for facet, flag in flags.items() if facet != grouped]
+        for grouped in FACETS + (None,)
+    }
+    return inner, counted
+
+
+def _grouping_sets_query(query: Select, params: BookFilterParams, bounds: Sequence[float]) -> Select:
+    """One pass with GROUP BY GROUPING SETS; the empty set gives the total.
+
+    grouping(column) is 0 for the rows of the set that column is in. Each
+    facet has its own count, FILTERed to the books matching the other
+    facets' filters; a row's count is the one of its set.
+    """
+    inner, counted = _facet_rows(query, params, bounds)
+    columns = [inner.c[name] for name in FACETS]
+    counts = [
+        func.count().filter(and_(*conditions)) if conditions else func.count()
+        for conditions in counted.values()
+    ]
+    return select(
+        *columns,
+        *(func.grouping(column) for column in columns),
+        *counts,
+    ).group_by(func.grouping_sets(*columns, tuple_()))
+
+
+def _union_query(query: Select, params: BookFilterParams, bounds: Sequence[float]) -> Select:
+    """The same rows as _grouping_sets_query for databases without GROUPING SETS"""
+    inner, counted = _facet_rows(query, params, bounds)
+    parts = []
+    for grouped, conditions in counted.items():
+        # Typed NULLs: the result types of a UNION come from its first SELECT
+        values = [inner.c[name] if name == grouped else literal(None, inner.c[name].type) for name in FACETS]
+        flags = [literal(0 if name == grouped else 1) for name in FACETS]
+        # The same count in every column, in the layout of _grouping_sets_query
+        part = select(*values, *flags, *[func.count()] * len(counted)).select_from(inner).where(*conditions)
+        if grouped is not None:
+            part = part.group_by(inner.c[grouped])
+        parts.append(part)
+    return union_all(*parts)
+
+
+def _counts(counts: Dict[Optional[object], int]) -> List[Tuple[object, int]]:
+    """Most common values first; books without a value and values without books are left out"""
+    return sorted(
+        ((value, count) for value, count in counts.items() if value is not None and count),
+        key=lambda item: (-item[1], item[0]),
+    )
+
+
+async def facet_counts(
+    db: AsyncSession, query: Select, params: BookFilterParams, bounds: Sequence[float]
+) -> dict:
+    """Facet counts of the books query filtered by params, as a BookFacets dict.
+
+    query only contributes its FROM and WHERE clauses; its columns are
+    replaced. The total has every filter applied, each facet all but its own.
+    """
+    if db.bind.dialect.name == "postgresql":
+        statement = _grouping_sets_query(query, params, bounds)
+    else:
+        statement = _union_query(query, params, bounds)
+    result = await db.execute(statement)
+
+    total = 0
+    counts: Dict[str, Dict[Optional[object], int]] = {name: {} for name in FACETS}
+    for row in result:
+        values, flags, row_counts = row[:4], row[4:8], row[8:]
+        grouped = [name for name, flag in zip(FACETS, flags) if flag == 0]
+        if not grouped:
+            total = row_counts[-1]
+            continue
+        name = grouped[0]
+        counts[name][values[FACETS.index(name)]] = row_counts[FACETS.index(name)]
+
+    lower_bounds = [0.0, *bounds]
+    upper_bounds = [*bounds, None]
+    return {
+        "total": total,
+        "categories": [{"id": value, "count": count} for value, count in _counts(counts["category"])],
+        "languages": [{"id": value, "count": count} for value, count in _counts(counts["language"])],
+        "listing_types": [
+            {"listing_type": value, "count": count} for value, count in _counts(counts["listing_type"])
+        ],
+        # Every range is listed, empty ones included, so the sidebar layout is stable
+        "price_ranges": [
+            {"min": low, "max": high, "count": counts["price_range"].get(index, 0)}
+            for index, (low, high) in enumerate(zip(lower_bounds, upper_bounds))
+        ],
+    }
@@ -0,0 +1,67 @@
+from typing import Collection, Dict, Tuple
+from sqlalchemy.sql import ColumnElement, Select
+from app.models.book import Book
+from app.schemas.book import BookFilterParams
+from app.utils.search import search_backend
+
+
+def filter_conditions(params: BookFilterParams) -> Dict[str, ColumnElement]:
+    """The column conditions of the set filters, by parameter name (search aside)"""
+    conditions = {}
+    if params.category_id:
+        conditions["category_id"] = Book.category_id == params.category_id
+
+    if params.language_id:
+        conditions["language_id"] = Book.language_id == params.language_id
+
+    if params.listing_type:
+        conditions["listing_type"] = Book.listing_type == params.listing_type
+
+    if params.min_price is not None:
+        conditions["min_price"] = Book.price >= params.min_price
+
+    if params.max_price is not None:
+        conditions["max_price"] = Book.price <= params.max_price
+
+    # author/location substring filters are served by trigram indexes on Postgres
+    if params.author:
+        conditions["author"] = Book.author.ilike(f"%{params.author}%")
+
+    if params.location:
+        conditions["location"] = Book.location.ilike(f"%{params.location}%")
+
+    return conditions
+
+
+def apply_book_filters(query: Select, params: BookFilterParams, exclude: Collection[str] = ()) -> Select:
+    """Apply BookFilterParams filters (not pagination) to a books query, except those named in exclude"""
+    for name, condition in filter_conditions(params).items():
+        if name not in exclude:
+            query = query.where(condition)
+
+    if params.search:
+        query = search_backend.apply(query, params.search)
+
+    return query
+
+
+def filter_key(params: BookFilterParams) -> Tuple:
+    """Normalized, hashable key of the filters that apply_book_filters would use.
+
+    Two parameter sets with the same key select the same rows.
+    """
+    key = []
+    for field in ("category_id", "language_id", "listing_type"):
+        value = getattr(params, field)
+        if value:
+            key.append((field, value))
+    for field in ("min_price", "max_price"):
+        value = getattr(params, field)
+        if value is not None:
+            key.append((field, value))
+    # ilike is case-insensitive, so case does not change the result set
+    for field in ("author", "location", "search"):
+        value = getattr(params, field)
+        if value:
+            key.append((field, value.lower()))
+    return tuple(key)
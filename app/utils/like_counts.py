@@ -0,0 +1,34 @@
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.book import Book
+from app.models.like import Like
+
+RECONCILE_BATCH_SIZE = 10_000
+
+
+async def reconcile_like_counts(db: AsyncSession, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """Re-derive books.like_count from the likes table.
+
+    Counts drift when likes disappear without going through the likes
+    router, e.g. by cascade when a user is deleted. Works through id ranges
+    and commits per batch so no lock is held across the whole table.
+    Returns the number of corrected books.
+    """
+    max_id = (await db.execute(select(func.max(Book.id)))).scalar() or 0
+    actual = (
+        select(func.count(Like.id))
+        .where(Like.book_id == Book.id)
+        .correlate(Book)
+        .scalar_subquery()
+    )
+    corrected = 0
+    for start in range(0, max_id + 1, batch_size):
+        result = await db.execute(
+            update(Book)
+            .where(Book.id >= start, Book.id < start + batch_size, Book.like_count != actual)
+            .values(like_count=actual, updated_at=Book.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        corrected += result.rowcount
+    return corrected
@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.config import settings
+from app.models.like import Like
+
+
+class LikedBooksCache:
+    """TTL + LRU map from user id to the full set of book ids they liked.
+
+    Only users with at most max_set_size likes have their set cached, which
+    keeps the memory per entry small; larger users get an entry without a set,
+    so their lookups don't load the set again just to find it too big. The
+    likes router keeps cached sets up to date in this process; other workers
+    catch up within the TTL.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, max_set_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_set_size = max_set_size
+        self._entries: "OrderedDict[int, Tuple[float, Optional[Set[int]]]]" = OrderedDict()
+
+    def get(self, user_id: int) -> Tuple[bool, Optional[Set[int]]]:
+        """(hit, book ids); a hit without book ids is a user with too many likes"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self._entries[user_id]
+            return False, None
+        self._entries.move_to_end(user_id)
+        return True, entry[1]
+
+    def set(self, user_id: int, book_ids: Optional[Set[int]]) -> None:
+        """Cache a user's liked set, None for more than max_set_size likes"""
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, book_ids)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def update(self, user_id: int, liked: Iterable[int] = (), unliked: Iterable[int] = ()) -> None:
+        """Apply committed like changes to a cached set"""
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] is None:
+            return
+        book_ids = entry[1]
+        book_ids.update(liked)
+        book_ids.difference_update(unliked)
+        if len(book_ids) > self.max_set_size:
+            self._entries[user_id] = (entry[0], None)
+
+
+liked_books_cache = LikedBooksCache(
+    ttl_seconds=settings.LIKED_BOOKS_CACHE_TTL_SECONDS,
+    max_entries=settings.LIKED_BOOKS_CACHE_MAX_ENTRIES,
+    max_set_size=settings.LIKED_BOOKS_CACHE_MAX_SET_SIZE,
+)
+
+
+def liked_set_query(user_id: int) -> Select:
+    """All of a user's liked book ids, up to one more than a cacheable set"""
+    return select(Like.book_id).where(Like.user_id == user_id).limit(liked_books_cache.max_set_size + 1)
+
+
+async def liked_book_ids(db: AsyncSession, user_id: int, book_ids: Iterable[int]) -> Set[int]:
+    """Which of book_ids the user liked, in at most one query per page"""
+    book_ids = set(book_ids)
+    if not book_ids:
+        return set()
+
+    hit, cached = liked_books_cache.get(user_id)
+    if cached is not None:
+        return cached & book_ids
+
+    if not hit:
+        # Load the whole set when it is small enough to cache
+        result = await db.execute(liked_set_query(user_id))
+        all_liked = set(result.scalars().all())
+        if len(all_liked) <= liked_books_cache.max_set_size:
+            liked_books_cache.set(user_id, all_liked)
+            return all_liked & book_ids
+        liked_books_cache.set(user_id, None)
+
+    result = await db.execute(
+        select(Like.book_id).where(Like.user_id == user_id, Like.book_id.in_(book_ids))
+    )
+    return set(result.scalars().all())
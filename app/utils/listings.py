@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.sql import ColumnElement, Select
+from app.models.book import Book, ListingStatus
+from app.models.like import Like
+from app.schemas.book import BookFilterParams, BookOrdering
+from app.utils.filters import apply_book_filters
+from app.utils.pagination import decode_cursor
+from app.utils.search import search_backend
+from app.utils.serialization import BOOK_COLUMNS
+
+# Statements behind the book listings. The routers execute them and
+# benchmarks.plan_regression EXPLAINs them, so what is checked is what runs.
+# The *_query functions give the filtered rows, which is also what gets
+# counted; the *_page functions add ordering and pagination.
+
+
+def public_books_query(params: BookFilterParams, columns: Sequence = BOOK_COLUMNS) -> Select:
+    """Approved books matching the filters of GET /books"""
+    query = select(*columns).where(Book.status == ListingStatus.APPROVED)
+    return apply_book_filters(query, params)
+
+
+def orders_by_relevance(params: BookFilterParams) -> bool:
+    return params.order_by == BookOrdering.RELEVANCE and bool(params.search)
+
+
+def sort_key(params: BookFilterParams) -> Tuple[Tuple[ColumnElement, ...], Tuple[type, ...]]:
+    """The keyset sort columns of GET /books, and the types of their cursor values"""
+    if params.order_by == BookOrdering.POPULAR:
+        return (Book.like_count, Book.id), (int, int)
+    return (Book.created_at, Book.id), (datetime, int)
+
+
+def public_books_page(query: Select, params: BookFilterParams) -> Select:
+    """A page of public_books_query, plus one row to know whether there is a next page.
+
+    Keyset when a cursor is given, offset otherwise. Sort keys end with the
+    unique id, so pages stay stable while new books arrive.
+    """
+    if orders_by_relevance(params):
+        if params.cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not available for relevance ordering"
+            )
+        query = query.order_by(search_backend.relevance(params.search))
+    sort_columns, cursor_types = sort_key(params)
+    query = query.order_by(*(column.desc() for column in sort_columns))
+    if params.cursor:
+        cursor_values = decode_cursor(params.cursor, params.order_by.value, cursor_types)
+        query = query.where(tuple_(*sort_columns) < tuple(cursor_values))
+    else:
+        query = query.offset((params.page - 1) * params.page_size)
+    return query.limit(params.page_size + 1)
+
+
+def seller_listings_query(
+    seller_id: int, status_filter: Optional[ListingStatus] = None, columns: Sequence = BOOK_COLUMNS
+) -> Select:
+    """A seller's books, any status unless filtered"""
+    query = select(*columns).where(Book.seller_id == seller_id)
+    if status_filter:
+        query = query.where(Book.status == status_filter)
+    return query
+
+
+def seller_listings_page(query: Select, page: int, page_size: int) -> Select:
+    return query.order_by(Book.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
+
+
+def saved_books_query(user_id: int, columns: Sequence = BOOK_COLUMNS) -> Select:
+    """The books a user liked"""
+    return select(*columns).join(Like).where(Like.user_id == user_id)
+
+
+def saved_books_page(query: Select, page: int, page_size: int) -> Select:
+    """Newest like first"""
+    return query.order_by(Like.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
+
+
+def moderation_queue_page(limit: int, cursor: Optional[str] = None) -> Select:
+    """Pending books oldest first, plus one row to know whether there is a next page"""
+    query = (
+        select(Book)
+        .where(Book.status == ListingStatus.PENDING)
+        .order_by(Book.created_at, Book.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, book_id = decode_cursor(cursor, "queue", (datetime, int))
+        query = query.where(tuple_(Book.created_at, Book.id) > (created_at, book_id))
+    return query
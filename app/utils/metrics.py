@@ -0,0 +1,192 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from app.utils.query_budget import MODES, check_request, check_statement
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Requests that matched no route share one label, so bad URLs can't grow the registry
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class RequestDBStats:
+    """SQL statements issued while handling one request.
+
+    The statements themselves are only kept when query budgets are checked.
+    """
+
+    __slots__ = ("statements", "seconds", "scope", "budget_mode", "sql")
+
+    def __init__(self, scope: dict, budget_mode: str = "off"):
+        self.statements = 0
+        self.seconds = 0.0
+        self.scope = scope
+        self.budget_mode = budget_mode
+        self.sql: Optional[List[str]] = [] if budget_mode != "off" else None
+
+
+# Set by the middleware for the duration of a request. SQLAlchemy runs the
+# driver calls in greenlets that inherit the caller's context, so the engine
+# events see the request's object.
+current_request_db: ContextVar[Optional[RequestDBStats]] = ContextVar("current_request_db", default=None)
+
+
+def record_statement(seconds: float, statement: str) -> None:
+    """Called from the engine events for every executed statement"""
+    stats = current_request_db.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += seconds
+        if stats.sql is not None:
+            stats.sql.append(statement)
+            check_statement(stats.scope, stats.sql, stats.budget_mode)
+
+
+class RouteMetrics:
+    __slots__ = ("latency", "statements", "db_seconds", "responses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.responses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """Per-route request metrics of this process"""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float, db: RequestDBStats) -> None:
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(seconds)
+        metrics.statements.observe(db.statements)
+        metrics.db_seconds += db.seconds
+        metrics.responses[status_code] = metrics.responses.get(status_code, 0) + 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            "# HELP http_request_duration_seconds Time to handle a request, response body included.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines += metrics.latency.lines("http_request_duration_seconds", _labels(method, route))
+        lines += [
+            "# HELP http_responses_total Responses by status code.",
+            "# TYPE http_responses_total counter",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            for status_code, count in sorted(metrics.responses.items()):
+                lines.append(f'http_responses_total{{{_labels(method, route)},status="{status_code}"}} {count}')
+        lines += [
+            "# HELP http_request_db_statements SQL statements issued per request.",
+            "# TYPE http_request_db_statements histogram",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines += metrics.statements.lines("http_request_db_statements", _labels(method, route))
+        lines += [
+            "# HELP http_request_db_seconds_total Time spent executing SQL statements.",
+            "# TYPE http_request_db_seconds_total counter",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines.append(f"http_request_db_seconds_total{{{_labels(method, route)}}} {metrics.db_seconds:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{method}",route="{route}"'
+
+
+def gauge_lines(name: str, help_text: str, values: Dict[str, float]) -> List[str]:
+    """A labelled gauge family, e.g. from one of the stats() dicts"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for key, value in values.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f'{name}{{name="{key}"}} {value}')
+    return lines
+
+
+metrics_registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and DB usage per route.
+
+    Routes are labelled with their path template (/books/{book_id}), which is
+    only known after routing, so the label is read from the scope afterwards.
+    With a budget_mode other than "off" it also enforces @query_budget.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics_registry, budget_mode: str = "off"):
+        if budget_mode not in MODES:
+            raise ValueError(f"Unknown QUERY_BUDGET_MODE: {budget_mode}")
+        self.app = app
+        self.registry = registry
+        self.budget_mode = budget_mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        db = RequestDBStats(scope, self.budget_mode)
+        token = current_request_db.set(db)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_db.reset(token)
+            if db.sql is not None:
+                check_request(scope, db.sql, self.budget_mode)
+            route = scope.get("route")
+            self.registry.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                elapsed,
+                db,
+            )
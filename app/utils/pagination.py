@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Sequence
+from fastapi import HTTPException, status
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+
+def encode_cursor(ordering: str, *values: Any) -> str:
+    """Encode the sort key of the last item into an opaque cursor"""
+    encoded = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps([ordering, *encoded], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: str, types: Sequence[type]) -> List[Any]:
+    """Decode a cursor produced by encode_cursor for the same ordering.
+
+    types are the Python types of the sort key, e.g. (datetime, int); a
+    cursor whose values don't match them position by position is rejected,
+    so tampered cursors never reach the database as mistyped comparisons.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_ordering, *values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in values]
+    except (ValueError, TypeError, KeyError):
+        raise _invalid_cursor()
+    if cursor_ordering != ordering or len(values) != len(types):
+        raise _invalid_cursor()
+    for value, expected in zip(values, types):
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise _invalid_cursor()
+    return values
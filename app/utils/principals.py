@@ -0,0 +1,56 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight snapshot of the authenticated user.
+
+    Enough for routes that only need to know who is calling; routes that
+    read or change the profile load the full User instead.
+    """
+    id: int
+    email: str
+
+
+class PrincipalCache:
+    """TTL + LRU map from access token to Principal"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Principal]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return principal
+
+    def set(self, token: str, principal: Principal, token_expires_at: Optional[float] = None) -> None:
+        """Cache a principal, never beyond the token's own expiry"""
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        self._entries[token] = (expires_at, principal)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        for token in [t for t, (_, p) in self._entries.items() if p.id == user_id]:
+            del self._entries[token]
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,184 @@
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from app.config import settings
+from app.utils.metrics import current_request_db
+
+PROFILE_HEADER = "x-profile"
+# Signed headers are accepted for this long, so a leaked one can't be replayed forever
+SIGNATURE_MAX_AGE_SECONDS = 300
+
+
+def _signature(secret: str, timestamp: int, method: str, path: str) -> str:
+    message = f"{timestamp}:{method.upper()}:{path}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_profile_request(secret: str, method: str, path: str, timestamp: Optional[int] = None) -> str:
+    """Value of the X-Profile header that asks for a profile of one method + path"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    return f"{timestamp}.{_signature(secret, timestamp, method, path)}"
+
+
+def verify_profile_header(secret: str, value: str, method: str, path: str) -> bool:
+    try:
+        timestamp_text, signature = value.split(".", 1)
+        timestamp = int(timestamp_text)
+    except ValueError:
+        return False
+    if abs(time.time() - timestamp) > SIGNATURE_MAX_AGE_SECONDS:
+        return False
+    return hmac.compare_digest(signature, _signature(secret, timestamp, method, path))
+
+
+class ProfileStore:
+    """Bounded ring of saved profiles: <id>.prof (pstats) and <id>.json (metadata)"""
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._loaded = False
+
+    def _load(self) -> None:
+        # Profiles saved before a restart stay listed
+        self._loaded = True
+        if not self.directory.is_dir():
+            return
+        entries = []
+        for meta_path in self.directory.glob("*.json"):
+            try:
+                entries.append(json.loads(meta_path.read_text()))
+            except (OSError, ValueError):
+                continue
+        for entry in sorted(entries, key=lambda entry: entry["created_at"]):
+            self._entries[entry["id"]] = entry
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_profiles:
+            profile_id, _ = self._entries.popitem(last=False)
+            for suffix in (".prof", ".json"):
+                (self.directory / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+    def save(self, profiler: cProfile.Profile, metadata: dict) -> None:
+        if not self._loaded:
+            self._load()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = metadata["id"]
+        profiler.dump_stats(self.directory / f"{profile_id}.prof")
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(metadata))
+        self._entries[profile_id] = metadata
+        self._evict()
+
+    def list(self) -> List[dict]:
+        """Newest first"""
+        if not self._loaded:
+            self._load()
+        return list(reversed(self._entries.values()))
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """The .prof file of a listed profile; unknown ids (and path tricks) give None"""
+        if not self._loaded:
+            self._load()
+        if profile_id not in self._entries:
+            return None
+        return self.directory / f"{profile_id}.prof"
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+
+class ProfilingMiddleware:
+    """Runs selected requests under cProfile and saves the result.
+
+    A request is profiled when it carries a valid signed X-Profile header
+    (see sign_profile_request) or is picked by PROFILE_SAMPLE_RATE. Only one
+    request per process is profiled at a time: cProfile records the whole
+    thread, so time spent in other requests interleaved on the event loop
+    shows up as well; read profiles of busy workers with that in mind.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore = profile_store,
+        secret: Optional[str] = None,
+        sample_rate: float = 0.0,
+        sampler: Callable[[], float] = random.random,
+    ):
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.sampler = sampler
+        self._active = False
+
+    def _trigger(self, scope) -> Optional[str]:
+        if self.secret:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER.encode():
+                    if verify_profile_header(self.secret, value.decode("latin-1"), scope["method"], scope["path"]):
+                        return "header"
+                    break
+        if self.sample_rate and self.sampler() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:16]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active = False
+            route = scope.get("route")
+            metadata: Dict = {
+                "id": profile_id,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "trigger": trigger,
+                "method": scope["method"],
+                "route": getattr(route, "path", None),
+                "path": scope["path"],
+                "params": dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))),
+                "status_code": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+            # Set when the metrics middleware runs around this one
+            db = current_request_db.get()
+            if db is not None:
+                metadata["sql_statements"] = db.statements
+                metadata["sql_ms"] = round(db.seconds * 1000, 2)
+            await asyncio.to_thread(self.store.save, profiler, metadata)
@@ -0,0 +1,58 @@
+import logging
+from typing import Callable, List, Optional, TypeVar
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+MODES = ("off", "log", "raise")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(max_statements: int, sqlite: Optional[int] = None) -> Callable[[F], F]:
+    """Declare how many SQL statements one request to an endpoint may issue.
+
+    Enforced per QUERY_BUDGET_MODE: "log" warns after the request, "raise"
+    fails the statement that goes over the budget. Put it below the route
+    decorator so the router registers the annotated function. sqlite is the
+    budget on SQLite, for endpoints whose fallback there takes more statements.
+    """
+    if sqlite is not None and settings.DATABASE_URL.startswith("sqlite"):
+        max_statements = sqlite
+
+    def decorate(endpoint: F) -> F:
+        endpoint.query_budget = max_statements
+        return endpoint
+    return decorate
+
+
+def endpoint_budget(scope: dict) -> Optional[int]:
+    return getattr(scope.get("endpoint"), "query_budget", None)
+
+
+def _describe(scope: dict, statements: List[str], budget: int) -> str:
+    lines = [f"{scope['method']} {scope['path']} issued {len(statements)} SQL statements, budget is {budget}:"]
+    lines += [f"  {number}. {sql}" for number, sql in enumerate(statements, 1)]
+    return "\n".join(lines)
+
+
+def check_statement(scope: dict, statements: List[str], mode: str) -> None:
+    """Called after each statement of a request; raises once it is over budget"""
+    if mode != "raise":
+        return
+    budget = endpoint_budget(scope)
+    if budget is not None and len(statements) > budget:
+        raise QueryBudgetExceeded(_describe(scope, statements, budget))
+
+
+def check_request(scope: dict, statements: List[str], mode: str) -> None:
+    """Called when a request finished"""
+    if mode != "log":
+        return
+    budget = endpoint_budget(scope)
+    if budget is not None and len(statements) > budget:
+        logger.warning(_describe(scope, statements, budget))
@@ -0,0 +1,91 @@
+import time
+from typing import FrozenSet, Optional, Set, Type
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import Base
+from app.models.category import Category
+from app.models.language import Language
+from app.schemas.book import LanguageResponse
+from app.schemas.category import CategoryResponse
+from app.utils.etag import make_etag, etag_matches
+
+class ReferenceTable:
+    """In-memory copy of a small, rarely changing table.
+
+    Keeps the set of ids for validation and the serialized list response with
+    its ETag. It is refreshed after REFERENCE_DATA_TTL_SECONDS, on an explicit
+    reload() and when a lookup finds a row it did not know, so rows added
+    directly in the database show up without a restart.
+    """
+
+    def __init__(self, model: Type[Base], schema: Type[BaseModel]):
+        self.model = model
+        self.adapter = TypeAdapter(list[schema])
+        self.ids: FrozenSet[int] = frozenset()
+        self.body = b"[]"
+        self.etag = make_etag(self.body)
+        self.loaded_at = 0.0
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.loaded_at > settings.REFERENCE_DATA_TTL_SECONDS
+
+    async def reload(self, db: AsyncSession) -> None:
+        result = await db.execute(select(self.model).order_by(self.model.name))
+        rows = result.scalars().all()
+        self.ids = frozenset(row.id for row in rows)
+        self.body = self.adapter.dump_json(self.adapter.validate_python(rows, from_attributes=True))
+        self.etag = make_etag(self.body)
+        self.loaded_at = time.monotonic()
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        if self.is_stale:
+            await self.reload(db)
+
+    async def exists(self, db: AsyncSession, row_id: int) -> bool:
+        """Validate a foreign key, without a query for known ids"""
+        await self.ensure_fresh(db)
+        if row_id in self.ids:
+            return True
+        # Unknown ids may have been added since the last load
+        if await db.get(self.model, row_id) is None:
+            return False
+        await self.reload(db)
+        return True
+
+    async def missing(self, db: AsyncSession, row_ids: Set[int]) -> Set[int]:
+        """The ids that don't exist, reloading at most once"""
+        await self.ensure_fresh(db)
+        unknown = row_ids - self.ids
+        if unknown:
+            await self.reload(db)
+            unknown = row_ids - self.ids
+        return unknown
+
+    def response(self, if_none_match: Optional[str] = None) -> Response:
+        headers = {"ETag": self.etag}
+        if etag_matches(if_none_match, self.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class ReferenceRegistry:
+    """Categories and languages, loaded once at startup"""
+
+    def __init__(self):
+        self.categories = ReferenceTable(Category, CategoryResponse)
+        self.languages = ReferenceTable(Language, LanguageResponse)
+
+    async def reload(self, db: AsyncSession) -> None:
+        await self.categories.reload(db)
+        await self.languages.reload(db)
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        await self.categories.ensure_fresh(db)
+        await self.languages.ensure_fresh(db)
+
+
+reference_data = ReferenceRegistry()
@@ -0,0 +1,168 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from itertools import product
+from typing import Dict, FrozenSet, Hashable, Optional, Set, Tuple
+from app.config import settings
+
+
+def listing_tags(category_id: Optional[int], language_id: Optional[int]) -> FrozenSet[str]:
+    """Tags of a cached listing; "*" means the listing is not filtered on that field"""
+    return frozenset({
+        f"category:{category_id or '*'}",
+        f"language:{language_id or '*'}",
+    })
+
+
+def book_tag_groups(category_id: Optional[int], language_id: Optional[int]) -> Tuple[Set[str], ...]:
+    """Tag groups of the listings a public book can appear in.
+
+    A listing is affected when it is unfiltered or filtered on the book's
+    value, for the category and the language alike.
+    """
+    return (
+        {f"category:{category_id}", "category:*"},
+        {f"language:{language_id}", "language:*"},
+    )
+
+
+class ResponseCache(ABC):
+    """Interface of response cache backends storing pre-serialized bodies"""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """The cached body, None on a miss"""
+
+    @abstractmethod
+    def set(self, key: Hashable, body: bytes, tags: FrozenSet[str] = frozenset()) -> None:
+        """Store a body under key, tagged for invalidate()"""
+
+    @abstractmethod
+    def invalidate(self, *tag_groups: Set[str]) -> None:
+        """Drop entries having at least one tag from every group"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Counters for GET /stats"""
+
+
+class NullResponseCache(ResponseCache):
+    """Disables caching"""
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        return None
+
+    def set(self, key: Hashable, body: bytes, tags: FrozenSet[str] = frozenset()) -> None:
+        pass
+
+    def invalidate(self, *tag_groups: Set[str]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Per-process LRU + TTL cache.
+
+    Writes invalidate it locally; other workers catch up within the TTL.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, bytes, FrozenSet[str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, body: bytes, tags: FrozenSet[str] = frozenset()) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, body, tags)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *tag_groups: Set[str]) -> None:
+        stale = [
+            key for key, (_, _, tags) in self._entries.items()
+            if all(tags & group for group in tag_groups)
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
+
+
+def get_response_cache(backend: str) -> ResponseCache:
+    if backend == "memory":
+        return InMemoryResponseCache(
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        )
+    if backend == "none":
+        return NullResponseCache()
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+
+
+response_cache = get_response_cache(settings.RESPONSE_CACHE_BACKEND)
+
+
+class ListingVersions:
+    """Per-process change counters of listing tag sets, for list ETags.
+
+    Bumped with the same tag groups as ResponseCache.invalidate, so a
+    listing's version changes exactly when its cached body would be dropped.
+    Other workers don't see the bump; like the response cache, list ETags
+    rely on a TTL for that (see bucket).
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._versions: Dict[FrozenSet[str], int] = {}
+
+    def version(self, tags: FrozenSet[str]) -> int:
+        return self._versions.get(tags, 0)
+
+    def bump(self, *tag_groups: Set[str]) -> None:
+        for tags in product(*tag_groups):
+            key = frozenset(tags)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def bucket(self) -> int:
+        """Wall-clock TTL window; the same in every worker, so ETags agree across them"""
+        return int(time.time() // self.ttl_seconds)
+
+
+listing_versions = ListingVersions(settings.RESPONSE_CACHE_TTL_SECONDS)
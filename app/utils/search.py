@@ -0,0 +1,125 @@
+import re
+from abc import ABC, abstractmethod
+from typing import List
+from sqlalchemy import column, func, literal_column, or_, select, table
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import ColumnElement, Select
+from app.database import engine
+from app.models.book import Book
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_tokens(term: str) -> List[str]:
+    """Lowercased words of a search term"""
+    return _WORD_RE.findall(term.lower())
+
+
+def ilike_search(query: Select, term: str) -> Select:
+    """Substring search, used when a term has no indexable words"""
+    search_term = f"%{term}%"
+    return query.where(or_(Book.title.ilike(search_term), Book.author.ilike(search_term)))
+
+
+class SearchBackend(ABC):
+    """Full-text search over book titles and authors.
+
+    Every word of the search term is matched as a prefix, so "harr pot"
+    finds "Harry Potter" - close to the old ilike behaviour while still
+    being served from an index.
+    """
+
+    @abstractmethod
+    def apply(self, query: Select, term: str) -> Select:
+        """Restrict a books query to rows matching the term"""
+
+    @abstractmethod
+    def relevance(self, term: str) -> ColumnElement:
+        """ORDER BY expression, best match first. Only valid after apply()"""
+
+    def install(self, connection: Connection) -> None:
+        """Create what the backend needs outside the migrations (use with conn.run_sync)"""
+
+    def check(self, connection: Connection) -> None:
+        """Run one ranked search, so a missing index fails at setup instead of on a request"""
+        term = "check"
+        connection.execute(self.apply(select(Book.id), term).order_by(self.relevance(term)).limit(1))
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Uses the generated books.search_vector column and its GIN index (created by the migrations)"""
+
+    search_vector = literal_column("books.search_vector")
+    # Inlined rather than bound so the query can be compiled with literal binds for EXPLAIN
+    config = literal_column("'simple'::regconfig")
+
+    def _tsquery(self, tokens: List[str]) -> ColumnElement:
+        return func.to_tsquery(self.config, " & ".join(f"{token}:*" for token in tokens))
+
+    def apply(self, query: Select, term: str) -> Select:
+        tokens = search_tokens(term)
+        if not tokens:
+            return ilike_search(query, term)
+        return query.where(self.search_vector.op("@@")(self._tsquery(tokens)))
+
+    def relevance(self, term: str) -> ColumnElement:
+        tokens = search_tokens(term)
+        if not tokens:
+            return Book.created_at.desc()
+        return func.ts_rank(self.search_vector, self._tsquery(tokens)).desc()
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    """FTS5 external-content table over books, for offline tests and benchmarks.
+
+    Alembic does not manage it: install() runs from python -m app.cli
+    init-sqlite and from the benchmark generator.
+    """
+
+    fts = table("books_fts", column("rowid"), column("rank"))
+
+    ddl = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+        "title, author, content='books', content_rowid='id')",
+        # Weight title matches above author matches, like setweight A/B in Postgres
+        "INSERT INTO books_fts(books_fts, rank) VALUES('rank', 'bm25(10.0, 5.0)')",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+        "INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author); END",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+        "INSERT INTO books_fts(books_fts, rowid, title, author) "
+        "VALUES ('delete', old.id, old.title, old.author); END",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author ON books BEGIN "
+        "INSERT INTO books_fts(books_fts, rowid, title, author) "
+        "VALUES ('delete', old.id, old.title, old.author); "
+        "INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author); END",
+        "INSERT INTO books_fts(books_fts) VALUES ('rebuild')",
+    ]
+
+    def install(self, connection: Connection) -> None:
+        """Create the FTS table and its sync triggers (use with conn.run_sync)"""
+        for statement in self.ddl:
+            connection.exec_driver_sql(statement)
+
+    def apply(self, query: Select, term: str) -> Select:
+        tokens = search_tokens(term)
+        if not tokens:
+            return ilike_search(query, term)
+        match = " ".join(f'"{token}"*' for token in tokens)
+        return query.join(self.fts, self.fts.c.rowid == Book.id).where(
+            literal_column("books_fts").op("MATCH")(match)
+        )
+
+    def relevance(self, term: str) -> ColumnElement:
+        if not search_tokens(term):
+            return Book.created_at.desc()
+        # FTS5 rank is bm25, where lower is better
+        return self.fts.c.rank.asc()
+
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    if dialect_name == "sqlite":
+        return SQLiteFTSSearchBackend()
+    return PostgresSearchBackend()
+
+
+search_backend = get_search_backend(engine.dialect.name)
@@ -1,11 +1,138 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Calibration never goes below MIN_BCRYPT_ROUNDS, whatever the hardware
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+T = TypeVar("T")
+
+
+def measure_hash_seconds(rounds: int, samples: int = 3) -> float:
+    """Best-of-n wall time of one bcrypt hash at the given cost"""
+    handler = pwd_context.handler("bcrypt").using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def calibrate_bcrypt_rounds(target_ms: float) -> int:
+    """Highest bcrypt cost whose hash time stays within target_ms.
+
+    Each extra round doubles the work, so measuring the floor cost once and
+    doubling is enough to find the cut-off.
+    """
+    rounds = MIN_BCRYPT_ROUNDS
+    seconds = measure_hash_seconds(rounds)
+    while rounds < MAX_BCRYPT_ROUNDS and seconds * 2 * 1000 <= target_ms:
+        rounds += 1
+        seconds *= 2
+    return rounds
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """Hash with this cost and flag hashes of any other cost for rehashing"""
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def configure_password_hashing() -> Optional[int]:
+    """Apply BCRYPT_ROUNDS, or calibrate against PASSWORD_HASH_TARGET_MS if enabled"""
+    rounds = settings.BCRYPT_ROUNDS
+    if rounds is None and settings.PASSWORD_HASH_CALIBRATE_ON_STARTUP:
+        rounds = calibrate_bcrypt_rounds(settings.PASSWORD_HASH_TARGET_MS)
+    if rounds is not None:
+        set_bcrypt_rounds(rounds)
+    return rounds
+
+
+class PasswordHashPoolBusy(Exception):
+    """No hashing worker became free within the queue timeout"""
+
+
+class PasswordHashPool:
+    """Bounded thread pool for bcrypt.
+
+    bcrypt releases the GIL, so hashing in threads keeps the event loop free
+    while still using several cores. At most `workers` hashes run at once;
+    further callers wait up to `queue_timeout` seconds for a slot. A slot is
+    held until its thread finishes, even when the caller was cancelled.
+    """
+
+    def __init__(self, workers: int, queue_timeout: float):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.busy_seconds_total = 0.0
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PasswordHashPoolBusy()
+        finally:
+            self.waiting -= 1
+
+        acquired = time.perf_counter()
+        self.wait_seconds_total += acquired - started
+        self.active += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        future.add_done_callback(lambda done: self._finished(done, acquired))
+        # Cancelling the caller (a client disconnect, a timeout) can't stop the
+        # thread, so the future is shielded and frees the slot when it is done
+        return await asyncio.shield(future)
+
+    def _finished(self, future: "asyncio.Future", acquired: float) -> None:
+        self.active -= 1
+        self.completed += 1
+        self.busy_seconds_total += time.perf_counter() - acquired
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()  # Retrieved here in case the caller is gone
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "workers": self.workers,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "busy_seconds_total": round(self.busy_seconds_total, 3),
+        }
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -17,6 +144,28 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also return a new hash if the stored one uses an outdated cost"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the hashing pool"""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password on the hashing pool"""
+    return await password_hash_pool.run(verify_and_update_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the hashing pool"""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -0,0 +1,127 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.models.book import Book
+from app.models.category import Category
+from app.models.language import Language
+from app.models.user import User
+from app.schemas.book import BookDetail, BookResponse, LanguageResponse
+from app.schemas.category import CategoryResponse
+from app.schemas.user import UserProfile
+
+# Same output as pydantic's model_dump_json for our types: str enums as
+# their value, aware UTC datetimes with a "Z" suffix
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(data: Any) -> bytes:
+    return orjson.dumps(data, option=JSON_OPTIONS)
+
+
+def loads(body: bytes) -> Any:
+    return orjson.loads(body)
+
+
+def json_response(data: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialized response that FastAPI passes through without response_model validation"""
+    return Response(content=dumps(data), status_code=status_code, headers=headers, media_type="application/json")
+
+
+class RowSerializer:
+    """Dumps rows as dicts shaped like a response model, without validating them.
+
+    Only for trusted rows: what the database returns already satisfies the
+    schema, so re-running its validators is wasted work. Keys come in the
+    model's field order, read once here; fields that are not columns (like
+    is_liked) start at the model default and are passed to from_row.
+
+    Read paths select columns() with Core and map the result rows through
+    from_row, so no ORM instances are built at all.
+    """
+
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        nested: Optional[Mapping[str, "RowSerializer"]] = None,
+        computed: Iterable[str] = (),
+    ):
+        self.model = model
+        self.nested = dict(nested or {})
+        computed = set(computed)
+        self._template: Dict[str, Any] = {
+            name: None if field.is_required() else field.get_default(call_default_factory=True)
+            for name, field in model.model_fields.items()
+        }
+        self._attributes = tuple(
+            name for name in model.model_fields if name not in computed and name not in self.nested
+        )
+
+    def columns(self, entity: Any, **nested_entities: Any) -> List[Any]:
+        """What to select for from_row: the model's attribute columns, then each nested model's"""
+        columns = [getattr(entity, name) for name in self._attributes]
+        for name, serializer in self.nested.items():
+            columns += serializer.columns(nested_entities[name])
+        return columns
+
+    def _read(self, row: Sequence, start: int) -> Tuple[Optional[Dict[str, Any]], int]:
+        end = start + len(self._attributes)
+        own = row[start:end]
+        item = self._template.copy()
+        item.update(zip(self._attributes, own))
+        for name, serializer in self.nested.items():
+            item[name], end = serializer._read(row, end)
+        # All NULL: an outer join that matched nothing
+        if all(value is None for value in own):
+            return None, end
+        return item, end
+
+    def from_row(self, row: Sequence, **values: Any) -> Dict[str, Any]:
+        """Map a row selected with columns()"""
+        if self.nested:
+            item, _ = self._read(tuple(row), 0)
+        else:
+            item = self._template.copy()
+            item.update(zip(self._attributes, row))
+        item.update(values)
+        return item
+
+
+book_serializer = RowSerializer(BookResponse, computed=("is_liked",))
+book_detail_serializer = RowSerializer(
+    BookDetail,
+    nested={
+        "seller": RowSerializer(UserProfile),
+        "category": RowSerializer(CategoryResponse),
+        "language": RowSerializer(LanguageResponse),
+    },
+    computed=("is_liked",),
+)
+
+BOOK_COLUMNS = book_serializer.columns(Book)
+BOOK_DETAIL_COLUMNS = book_detail_serializer.columns(
+    Book, seller=User, category=Category, language=Language
+)
+
+
+def book_list(
+    items: List[Dict[str, Any]],
+    total: Optional[int],
+    total_is_exact: bool,
+    page: int,
+    page_size: int,
+    total_pages: Optional[int],
+    next_cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """A BookListResponse body, keys in field order"""
+    return {
+        "items": items,
+        "total": total,
+        "total_is_exact": total_is_exact,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "next_cursor": next_cursor,
+    }
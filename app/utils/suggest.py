@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.book import Book, ListingStatus
+from app.utils.search import search_tokens
+
+logger = logging.getLogger(__name__)
+
+# Stop scanning once this many candidates were looked at, keeps worst-case lookups bounded
+MAX_CANDIDATES = 2000
+
+
+class SuggestIndex:
+    """In-memory word-prefix index over approved books' titles and authors.
+
+    A sorted vocabulary of words is bisected for the prefix range of the last
+    typed word; earlier words must match whole. Postings are plain lists of
+    book ids. The index holds at most max_books books; further additions are
+    dropped (and counted) until something is removed or the index is reloaded.
+
+    It is per process: add/remove only see changes made in this worker, so
+    refresh_periodically() reloads it to pick up the others'.
+    """
+
+    def __init__(self, max_books: int):
+        self.max_books = max_books
+        self.dropped = 0
+        self._docs: Dict[int, Tuple[str, str]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._vocabulary: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def clear(self) -> None:
+        self.dropped = 0
+        self._docs.clear()
+        self._postings.clear()
+        self._vocabulary.clear()
+
+    def add(self, book_id: int, title: str, author: str) -> None:
+        if book_id in self._docs:
+            self.remove(book_id)
+        if len(self._docs) >= self.max_books:
+            self.dropped += 1
+            return
+        self._docs[book_id] = (title, author)
+        for token in set(search_tokens(f"{title} {author}")):
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = [book_id]
+                insort(self._vocabulary, token)
+            else:
+                postings.append(book_id)
+
+    def remove(self, book_id: int) -> None:
+        doc = self._docs.pop(book_id, None)
+        if doc is None:
+            return
+        for token in set(search_tokens(f"{doc[0]} {doc[1]}")):
+            postings = self._postings[token]
+            postings.remove(book_id)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _prefix_range(self, prefix: str) -> range:
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + "\uffff", start)
+        return range(start, end)
+
+    def suggest(self, q: str, limit: int = 10) -> List[Tuple[int, str, str]]:
+        """Books whose words match q, the last word as a prefix"""
+        tokens = search_tokens(q)
+        if not tokens:
+            return []
+        *words, prefix = tokens
+
+        found: Dict[int, None] = {}
+        if not words:
+            for position in self._prefix_range(prefix):
+                for book_id in self._postings[self._vocabulary[position]]:
+                    found[book_id] = None
+                    if len(found) >= limit:
+                        break
+                if len(found) >= limit:
+                    break
+        else:
+            postings = [self._postings.get(word) for word in words]
+            if not all(postings):
+                return []
+            candidates = min(postings, key=len)
+            required = set(words)
+            for book_id in candidates[:MAX_CANDIDATES]:
+                title, author = self._docs[book_id]
+                doc_tokens = set(search_tokens(f"{title} {author}"))
+                if required <= doc_tokens and any(t.startswith(prefix) for t in doc_tokens):
+                    found[book_id] = None
+                    if len(found) >= limit:
+                        break
+
+        return [(book_id, *self._docs[book_id]) for book_id in found]
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)build the index from all approved books.
+
+        The new index is built aside, with the vocabulary sorted once at the
+        end, and swapped in whole; lookups meanwhile use the previous one.
+        """
+        docs: Dict[int, Tuple[str, str]] = {}
+        postings: Dict[str, List[int]] = {}
+        dropped = 0
+        result = await db.stream(
+            select(Book.id, Book.title, Book.author)
+            .where(Book.status == ListingStatus.APPROVED)
+            .execution_options(yield_per=5000)
+        )
+        async for book_id, title, author in result:
+            if len(docs) >= self.max_books:
+                dropped += 1
+                continue
+            docs[book_id] = (title, author)
+            for token in set(search_tokens(f"{title} {author}")):
+                book_ids = postings.get(token)
+                if book_ids is None:
+                    postings[token] = [book_id]
+                else:
+                    book_ids.append(book_id)
+        self._docs, self._postings, self._vocabulary = docs, postings, sorted(postings)
+        self.dropped = dropped
+        if dropped:
+            logger.warning("Suggest index is full, %d books were not indexed", dropped)
+
+    async def refresh_periodically(self, session_factory: Callable[[], AsyncSession], interval: float) -> None:
+        """Reload every interval seconds; run as a background task"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as db:
+                    await self.load(db)
+            except Exception:
+                logger.exception("Reloading the suggest index failed, keeping the previous one")
+
+
+suggest_index = SuggestIndex(max_books=settings.SUGGEST_MAX_BOOKS)
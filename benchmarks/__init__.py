@@ -0,0 +1,6 @@
+"""Performance benchmarks, run as modules from the repository root, e.g.
+
+    python -m benchmarks.login_storm
+
+They use the database from DATABASE_URL, so point it at a scratch database.
+"""
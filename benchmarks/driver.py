@@ -0,0 +1,343 @@
+"""End-to-end load over every router, with per-endpoint latency percentiles.
+
+    python -m benchmarks.driver --generate --books 20000 --duration 30 --concurrency 16
+    python -m benchmarks.driver --base-url http://localhost:8000 --duration 60
+
+Without --base-url the app runs in-process behind an ASGI transport (its
+startup hook included); with it, requests go to a running server that uses
+the same DATABASE_URL. --generate loads a fresh synthetic catalog first
+(see benchmarks.generator), otherwise previously generated users are reused.
+Each worker picks operations by weight in a closed loop; the report is
+written as JSON for benchmarks.report compare.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.database import engine
+from benchmarks import generator
+from benchmarks.report import Recorder, build_report, save
+
+PREFIX = settings.API_V1_PREFIX
+
+
+@dataclass
+class Worker:
+    client: httpx.AsyncClient
+    recorder: Recorder
+    catalog: generator.Catalog
+    token: str
+    rng: random.Random
+    own_books: List[int] = field(default_factory=list)
+    cursor: Optional[str] = None
+    # ETags of book details seen, for conditional revisits
+    etags: Dict[int, str] = field(default_factory=dict)
+    moderator_token: Optional[str] = None
+
+    @property
+    def auth(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    @property
+    def moderator_auth(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.moderator_token}"}
+
+    async def call(self, label: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, PREFIX + path, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.add(label, time.perf_counter() - started, 0)
+            return None
+        self.recorder.add(label, time.perf_counter() - started, response.status_code)
+        return response
+
+    def book_payload(self) -> dict:
+        return {
+            "title": " ".join(self.rng.choice(self.catalog.search_words) for _ in range(3)).capitalize(),
+            "author": "Benchmark Author",
+            "listing_type": "sell",
+            "price": round(self.rng.uniform(5, 200), 2),
+            "category_id": self.rng.choice(self.catalog.category_ids) if self.catalog.category_ids else None,
+            "language_id": self.rng.choice(self.catalog.language_ids) if self.catalog.language_ids else None,
+            "location": "Tashkent",
+        }
+
+
+# Operations ---------------------------------------------------------------
+
+async def list_books(w: Worker):
+    response = await w.call("GET /books", "GET", "/books")
+    if response is not None and response.status_code == 200:
+        w.cursor = response.json().get("next_cursor")
+
+
+async def list_books_next_page(w: Worker):
+    if w.cursor is None:
+        return await list_books(w)
+    response = await w.call("GET /books?cursor", "GET", "/books", params={"cursor": w.cursor})
+    if response is not None and response.status_code == 200:
+        w.cursor = response.json().get("next_cursor")
+
+
+async def list_books_by_category(w: Worker):
+    await w.call("GET /books?category_id", "GET", "/books",
+                 params={"category_id": w.rng.choice(w.catalog.category_ids)})
+
+
+async def list_books_search(w: Worker):
+    await w.call("GET /books?search", "GET", "/books",
+                 params={"search": w.rng.choice(w.catalog.search_words)})
+
+
+async def list_books_popular(w: Worker):
+    await w.call("GET /books?order_by=popular", "GET", "/books", params={"order_by": "popular"})
+
+
+async def list_books_authenticated(w: Worker):
+    await w.call("GET /books (auth)", "GET", "/books", headers=w.auth)
+
+
+async def facets(w: Worker):
+    params = {"category_id": w.rng.choice(w.catalog.category_ids)} if w.rng.random() < 0.5 else {}
+    await w.call("GET /books/facets", "GET", "/books/facets", params=params)
+
+
+async def book_detail(w: Worker):
+    book_id = w.rng.choice(w.catalog.approved_book_ids)
+    response = await w.call("GET /books/{id}", "GET", f"/books/{book_id}")
+    if response is not None and "etag" in response.headers:
+        w.etags[book_id] = response.headers["etag"]
+
+
+async def book_detail_revisit(w: Worker):
+    """A client re-opening a detail page it has cached"""
+    if not w.etags:
+        return await book_detail(w)
+    book_id = w.rng.choice(list(w.etags))
+    await w.call("GET /books/{id} (If-None-Match)", "GET", f"/books/{book_id}",
+                 headers={"If-None-Match": w.etags[book_id]})
+
+
+async def suggest(w: Worker):
+    word = w.rng.choice(w.catalog.search_words)
+    await w.call("GET /books/suggest", "GET", "/books/suggest", params={"q": word[:w.rng.randint(1, len(word))]})
+
+
+async def export_recent(w: Worker):
+    since = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    await w.call("GET /books/export", "GET", "/books/export", params={"since": since})
+
+
+async def categories(w: Worker):
+    await w.call("GET /categories", "GET", "/categories")
+
+
+async def languages(w: Worker):
+    await w.call("GET /languages", "GET", "/languages")
+
+
+async def profile(w: Worker):
+    await w.call("GET /users/me", "GET", "/users/me", headers=w.auth)
+
+
+async def my_listings(w: Worker):
+    await w.call("GET /users/me/listings", "GET", "/users/me/listings", headers=w.auth)
+
+
+async def saved_books(w: Worker):
+    await w.call("GET /users/me/saved", "GET", "/users/me/saved", headers=w.auth)
+
+
+async def like_and_unlike(w: Worker):
+    book_id = w.rng.choice(w.catalog.approved_book_ids)
+    response = await w.call("POST /likes", "POST", "/likes", json={"book_id": book_id}, headers=w.auth)
+    if response is not None and response.status_code == 201:
+        await w.call("DELETE /likes/{id}", "DELETE", f"/likes/{book_id}", headers=w.auth)
+
+
+async def batch_likes(w: Worker):
+    book_ids = w.rng.sample(w.catalog.approved_book_ids, min(20, len(w.catalog.approved_book_ids)))
+    toggles = [{"book_id": book_id, "liked": w.rng.random() < 0.5} for book_id in book_ids]
+    await w.call("POST /likes/batch", "POST", "/likes/batch", json={"toggles": toggles}, headers=w.auth)
+
+
+async def create_book(w: Worker):
+    response = await w.call("POST /books", "POST", "/books", json=w.book_payload(), headers=w.auth)
+    if response is not None and response.status_code == 201:
+        w.own_books.append(response.json()["id"])
+
+
+async def update_book(w: Worker):
+    if not w.own_books:
+        return await create_book(w)
+    book_id = w.rng.choice(w.own_books)
+    await w.call("PUT /books/{id}", "PUT", f"/books/{book_id}",
+                 json={"price": round(w.rng.uniform(5, 200), 2)}, headers=w.auth)
+
+
+async def delete_book(w: Worker):
+    if not w.own_books:
+        return await create_book(w)
+    book_id = w.own_books.pop()
+    await w.call("DELETE /books/{id}", "DELETE", f"/books/{book_id}", headers=w.auth)
+
+
+async def moderate_books(w: Worker):
+    """A moderator deciding on this worker's new (pending) books"""
+    if w.moderator_token is None:
+        return await list_books(w)
+    if not w.own_books:
+        return await create_book(w)
+    decision = "approve" if w.rng.random() < 0.8 else "reject"
+    await w.call("POST /moderation/decisions", "POST", "/moderation/decisions",
+                 json={"book_ids": w.own_books[-5:], "decision": decision}, headers=w.moderator_auth)
+
+
+async def login(w: Worker):
+    email = w.rng.choice(w.catalog.user_emails)
+    await w.call("POST /auth/login", "POST", "/auth/login",
+                 json={"email": email, "password": generator.PASSWORD})
+
+
+async def register(w: Worker):
+    email = f"bench-new-{w.rng.getrandbits(48):x}@example.com"
+    await w.call("POST /auth/register", "POST", "/auth/register",
+                 json={"email": email, "password": generator.PASSWORD})
+
+
+# Relative weights, roughly the traffic mix of a browsing-heavy marketplace
+OPERATIONS: List[Tuple[Callable[[Worker], Awaitable], int]] = [
+    (list_books, 20),
+    (list_books_next_page, 8),
+    (list_books_by_category, 10),
+    (list_books_search, 8),
+    (list_books_popular, 4),
+    (list_books_authenticated, 8),
+    (facets, 4),
+    (book_detail, 15),
+    (book_detail_revisit, 8),
+    (suggest, 10),
+    (categories, 3),
+    (languages, 3),
+    (profile, 2),
+    (my_listings, 2),
+    (saved_books, 2),
+    (like_and_unlike, 4),
+    (batch_likes, 1),
+    (create_book, 2),
+    (update_book, 1),
+    (delete_book, 1),
+    (moderate_books, 1),
+    (export_recent, 1),
+    (login, 1),
+    (register, 1),
+]
+
+
+async def _token(client: httpx.AsyncClient, email: str) -> str:
+    response = await client.post(f"{PREFIX}/auth/login", json={"email": email, "password": generator.PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.generate:
+        async with engine.begin() as conn:
+            catalog = await generator.generate(
+                conn, args.users, args.books, args.likes, args.categories, args.languages, args.seed
+            )
+    else:
+        async with engine.connect() as conn:
+            catalog = await generator.load_catalog(conn)
+    if not catalog.user_emails or not catalog.approved_book_ids:
+        raise SystemExit("No generated data found, run with --generate first")
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        from app.main import app
+        # The ASGI transport does not run startup hooks
+        await app.router.startup()
+        # Unhandled exceptions become 500 responses, counted as errors like a server's
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+
+    rng = random.Random(args.seed)
+    operations, weights = zip(*OPERATIONS)
+    async with client:
+        # Not measured: one session per worker, from distinct users
+        emails = rng.sample(catalog.user_emails, min(args.concurrency, len(catalog.user_emails)))
+        tokens = [await _token(client, email) for email in emails]
+        moderator_token = await _token(client, catalog.moderator_email) if catalog.moderator_email else None
+
+        recorder = Recorder()
+        deadline = time.perf_counter() + args.duration
+        remaining = [args.requests] if args.requests else None
+
+        async def work(index: int):
+            worker = Worker(
+                client=client,
+                recorder=recorder,
+                catalog=catalog,
+                token=tokens[index % len(tokens)],
+                rng=random.Random(args.seed * 1000 + index),
+                moderator_token=moderator_token,
+            )
+            while time.perf_counter() < deadline:
+                if remaining is not None:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+                operation = worker.rng.choices(operations, weights=weights)[0]
+                await operation(worker)
+            # Leave the catalog as it was
+            for book_id in worker.own_books:
+                await client.delete(f"{PREFIX}/books/{book_id}", headers=worker.auth)
+
+        await asyncio.gather(*(work(index) for index in range(args.concurrency)))
+        recorder.stop()
+
+    await engine.dispose()
+    config = {
+        key: value for key, value in vars(args).items() if key not in ("out",)
+    }
+    config["transport"] = "http" if args.base_url else "asgi"
+    config["catalog"] = {
+        "users": len(catalog.user_emails),
+        "books": len(catalog.book_ids),
+        "approved_books": len(catalog.approved_book_ids),
+    }
+    return build_report(recorder, config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many operations (0: no limit)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--generate", action="store_true", help="Generate a catalog before running")
+    parser.add_argument("--out", help="Report path (default: benchmarks/results/<timestamp>.json)")
+    generator.add_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    out = args.out or f"benchmarks/results/{datetime.now():%Y%m%d-%H%M%S}.json"
+    save(report, out)
+    print(json.dumps({key: report[key] for key in ("requests", "errors", "throughput_rps")}, indent=2))
+    for endpoint, stats in report["endpoints"].items():
+        print(f"{endpoint:<32} {stats['requests']:>7} req  p50 {stats['p50_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms")
+    print(f"Report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Bulk-load a synthetic catalog for benchmarks.
+
+    python -m benchmarks.generator --users 2000 --books 50000 --likes 200000 --seed 1
+
+Distributions follow what a marketplace looks like rather than uniform noise:
+category, language, author, seller and book popularity are Zipf-like (a few
+get most of the activity), prices are log-normal, most listings are approved
+and recent ones outnumber old ones. Every generated user can log in with
+PASSWORD. Rows are added next to existing data, so point DATABASE_URL at a
+scratch database.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine
+from app.models.book import Book, ListingStatus, ListingType
+from app.models.category import Category
+from app.models.language import Language
+from app.models.like import Like
+from app.models.user import User, UserRole
+from app.utils.search import search_backend
+from app.utils.security import get_password_hash
+
+PASSWORD = "benchmark-password"
+EMAIL_PATTERN = "bench-%@example.com"
+CHUNK_SIZE = 5000
+
+CATEGORY_NAMES = [
+    "Fiction", "Textbooks", "Children", "Science", "History", "Business", "Self-help",
+    "Poetry", "Religion", "Programming", "Languages", "Fantasy", "Biography", "Medicine",
+    "Law", "Art", "Philosophy", "Travel", "Cooking", "Comics",
+]
+LANGUAGES = [
+    ("O'zbek", "uz"), ("Русский", "ru"), ("English", "en"), ("Türkçe", "tr"),
+    ("Deutsch", "de"), ("Қазақ", "kk"), ("Français", "fr"), ("العربية", "ar"),
+]
+CITIES = ["Tashkent", "Samarkand", "Bukhara", "Namangan", "Andijan", "Fergana", "Nukus", "Karshi"]
+WORDS = [
+    "night", "garden", "history", "river", "silk", "road", "city", "stars", "mother", "war",
+    "peace", "secret", "house", "journey", "heart", "mountain", "language", "science", "code",
+    "winter", "letters", "memory", "island", "empire", "light", "shadow", "king", "desert",
+]
+STATUS_WEIGHTS = {ListingStatus.APPROVED: 80, ListingStatus.PENDING: 15, ListingStatus.REJECTED: 5}
+
+
+@dataclass
+class Catalog:
+    """What a benchmark driver needs to know about the generated data"""
+    user_emails: List[str] = field(default_factory=list)
+    book_ids: List[int] = field(default_factory=list)
+    approved_book_ids: List[int] = field(default_factory=list)
+    category_ids: List[int] = field(default_factory=list)
+    language_ids: List[int] = field(default_factory=list)
+    # Generated user with the moderator role, for the moderation endpoints
+    moderator_email: Optional[str] = None
+    likes: int = 0
+    search_words: List[str] = field(default_factory=lambda: list(WORDS))
+
+
+def zipf_weights(n: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative weights where rank k is picked proportionally to 1 / k**exponent"""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+async def _insert(conn: AsyncConnection, model, rows: Sequence[Dict]) -> List[int]:
+    """Insert rows in chunks and return their ids in the same order"""
+    ids: List[int] = []
+    for start in range(0, len(rows), CHUNK_SIZE):
+        result = await conn.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows[start:start + CHUNK_SIZE]
+        )
+        ids.extend(result.scalars().all())
+    return ids
+
+
+async def generate(
+    conn: AsyncConnection,
+    users: int,
+    books: int,
+    likes: int,
+    categories: int = 12,
+    languages: int = 5,
+    seed: int = 1,
+) -> Catalog:
+    if conn.dialect.name == "sqlite":
+        # The FTS table is kept in step by triggers, which must exist before the inserts
+        await conn.run_sync(search_backend.install)
+    rng = random.Random(seed)
+    run = uuid.uuid4().hex[:6]
+    now = datetime.now(timezone.utc)
+    catalog = Catalog()
+
+    category_rows = [
+        {"name": f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {run}-{i}", "slug": f"bench-{run}-{i}"}
+        for i in range(categories)
+    ]
+    catalog.category_ids = await _insert(conn, Category, category_rows)
+    language_rows = [
+        {"name": f"{LANGUAGES[i % len(LANGUAGES)][0]} {run}-{i}", "code": f"{run}{i}"}
+        for i in range(languages)
+    ]
+    catalog.language_ids = await _insert(conn, Language, language_rows)
+
+    # One hash for everyone: generating 10k bcrypt hashes would dominate the run
+    password = get_password_hash(PASSWORD)
+    catalog.user_emails = [f"bench-{run}-{i}@example.com" for i in range(users)]
+    user_rows = [
+        {
+            "email": email,
+            "password": password,
+            "first_name": f"User{i}",
+            "role": UserRole.MODERATOR if i == 0 else UserRole.USER,
+            "created_at": now - timedelta(days=rng.uniform(0, 730)),
+        }
+        for i, email in enumerate(catalog.user_emails)
+    ]
+    user_ids = await _insert(conn, User, user_rows)
+    catalog.moderator_email = catalog.user_emails[0] if catalog.user_emails else None
+
+    # A third of the users sell; a few power sellers own most listings
+    sellers = rng.sample(user_ids, max(1, users // 3))
+    seller_weights = zipf_weights(len(sellers), 0.9)
+    authors = [f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}ov" for _ in range(max(1, books // 20))]
+    author_weights = zipf_weights(len(authors))
+    category_weights = zipf_weights(categories, 0.8)
+    language_weights = zipf_weights(languages, 1.5)
+    city_weights = zipf_weights(len(CITIES), 1.2)
+
+    # Likes go to a popular head of approved books, by a skewed set of users
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=books)
+    approved_positions = [i for i, listing_status in enumerate(statuses) if listing_status == ListingStatus.APPROVED]
+    rng.shuffle(approved_positions)
+    like_pairs = set()
+    if approved_positions:
+        book_weights = zipf_weights(len(approved_positions))
+        user_weights = zipf_weights(users, 0.8)
+        attempts = 0
+        while len(like_pairs) < likes and attempts < likes * 3:
+            attempts += 1
+            user_index = rng.choices(range(users), cum_weights=user_weights)[0]
+            position = approved_positions[rng.choices(range(len(approved_positions)), cum_weights=book_weights)[0]]
+            like_pairs.add((user_index, position))
+    like_counts: Dict[int, int] = {}
+    for _, position in like_pairs:
+        like_counts[position] = like_counts.get(position, 0) + 1
+
+    book_rows = []
+    for i in range(books):
+        listing_type = ListingType.FREE if rng.random() < 0.15 else ListingType.SELL
+        # Skewed towards recent listings
+        created_at = now - timedelta(days=365 * rng.random() ** 2)
+        book_rows.append({
+            "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).capitalize(),
+            "author": authors[rng.choices(range(len(authors)), cum_weights=author_weights)[0]],
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 40))) or None,
+            "images": [f"https://img.example.com/{run}/{i}/{n}.jpg" for n in range(rng.randint(0, 3))],
+            "seller_id": sellers[rng.choices(range(len(sellers)), cum_weights=seller_weights)[0]],
+            "category_id": catalog.category_ids[rng.choices(range(categories), cum_weights=category_weights)[0]],
+            "language_id": catalog.language_ids[rng.choices(range(languages), cum_weights=language_weights)[0]],
+            "listing_type": listing_type,
+            "price": round(rng.lognormvariate(3.5, 0.8), 2) if listing_type == ListingType.SELL else None,
+            "location": CITIES[rng.choices(range(len(CITIES)), cum_weights=city_weights)[0]],
+            "status": statuses[i],
+            "like_count": like_counts.get(i, 0),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    catalog.book_ids = await _insert(conn, Book, book_rows)
+    catalog.approved_book_ids = [
+        book_id for book_id, listing_status in zip(catalog.book_ids, statuses)
+        if listing_status == ListingStatus.APPROVED
+    ]
+
+    like_rows = [
+        {
+            "user_id": user_ids[user_index],
+            "book_id": catalog.book_ids[position],
+            "created_at": book_rows[position]["created_at"] + (now - book_rows[position]["created_at"]) * rng.random(),
+        }
+        for user_index, position in like_pairs
+    ]
+    await _insert(conn, Like, like_rows)
+    catalog.likes = len(like_rows)
+    if conn.dialect.name == "postgresql":
+        # Fresh statistics, or the first benchmark runs see seq scan plans
+        await conn.exec_driver_sql("ANALYZE users, categories, languages, books, likes")
+    await conn.run_sync(search_backend.check)
+    return catalog
+
+
+async def load_catalog(conn: AsyncConnection) -> Catalog:
+    """Catalog of previously generated data, to benchmark without generating again"""
+    catalog = Catalog()
+    catalog.user_emails = (await conn.execute(
+        select(User.email).where(User.email.like(EMAIL_PATTERN)).order_by(User.id)
+    )).scalars().all()
+    catalog.moderator_email = (await conn.execute(
+        select(User.email)
+        .where(User.email.like(EMAIL_PATTERN), User.role == UserRole.MODERATOR)
+        .order_by(User.id)
+        .limit(1)
+    )).scalar()
+    catalog.category_ids = (await conn.execute(select(Category.id))).scalars().all()
+    catalog.language_ids = (await conn.execute(select(Language.id))).scalars().all()
+    rows = (await conn.execute(select(Book.id, Book.status))).all()
+    catalog.book_ids = [book_id for book_id, _ in rows]
+    catalog.approved_book_ids = [book_id for book_id, status in rows if status == ListingStatus.APPROVED]
+    return catalog
+
+
+async def run(args: argparse.Namespace) -> dict:
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        catalog = await generate(
+            conn, args.users, args.books, args.likes, args.categories, args.languages, args.seed
+        )
+    await engine.dispose()
+    return {
+        "users": len(catalog.user_emails),
+        "books": len(catalog.book_ids),
+        "approved_books": len(catalog.approved_book_ids),
+        "likes": catalog.likes,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--likes", type=int, default=50_000)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--languages", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
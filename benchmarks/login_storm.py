@@ -0,0 +1,88 @@
+"""Login throughput and GET /books latency during a burst of logins.
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 20
+
+Logins and book listings share one event loop through an in-process ASGI
+transport, so any time bcrypt spends on the loop shows up directly in the
+listing latencies. The app's startup hook runs first, so BCRYPT_ROUNDS and
+the hash pool calibration apply as in a server.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import List
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.utils.security import password_hash_pool
+from benchmarks.report import percentile
+
+PASSWORD = "benchmark-password"
+
+
+async def run(logins: int, concurrency: int, readers: int) -> dict:
+    prefix = settings.API_V1_PREFIX
+    # The ASGI transport does not run startup hooks
+    await app.router.startup()
+    # Unhandled exceptions become 500 responses, counted as errors like a server's
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        response = await client.post(f"{prefix}/auth/register", json={"email": email, "password": PASSWORD})
+        response.raise_for_status()
+
+        storm_running = True
+        read_latencies: List[float] = []
+        read_statuses: List[int] = []
+        login_statuses: List[int] = []
+
+        async def reader():
+            while storm_running:
+                started = time.perf_counter()
+                result = await client.get(f"{prefix}/books")
+                read_latencies.append(time.perf_counter() - started)
+                read_statuses.append(result.status_code)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with semaphore:
+                result = await client.post(f"{prefix}/auth/login", json={"email": email, "password": PASSWORD})
+                login_statuses.append(result.status_code)
+
+        reader_tasks = [asyncio.create_task(reader()) for _ in range(readers)]
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        storm_running = False
+        await asyncio.gather(*reader_tasks)
+
+    return {
+        "logins": logins,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "logins_per_second": round(logins / elapsed, 1),
+        "login_errors": sum(1 for code in login_statuses if code != 200),
+        "books_requests": len(read_latencies),
+        "books_errors": sum(1 for code in read_statuses if code >= 500),
+        "books_p50_ms": round(percentile(read_latencies, 50) * 1000, 2),
+        "books_p99_ms": round(percentile(read_latencies, 99) * 1000, 2),
+        "password_hash_pool": password_hash_pool.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.logins, args.concurrency, args.readers)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
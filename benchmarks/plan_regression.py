@@ -0,0 +1,192 @@
+"""Fail when a hot query's plan regresses to a sequential scan.
+
+    python -m benchmarks.plan_regression --books 50000
+
+Seeds synthetic users, books and likes into the PostgreSQL database in
+DATABASE_URL inside a transaction, runs ANALYZE and EXPLAIN on the statements
+behind GET /books, /users/me/listings, /users/me/saved and the moderation
+queue (built by app.utils.listings, as the routers build them), then rolls
+everything back. Exits with status 1 if any
+plan reads books or likes with a Seq Scan.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import Select
+
+from app.database import engine
+from app.models.book import Book, ListingStatus
+from app.models.like import Like
+from app.schemas.book import BookFilterParams, BookOrdering
+from app.utils.counts import count_query
+from app.utils.liked_books import liked_set_query
+from app.utils.listings import (
+    moderation_queue_page, public_books_page, public_books_query, saved_books_page, saved_books_query,
+    seller_listings_page, seller_listings_query
+)
+from app.utils.pagination import encode_cursor
+
+# Tables that must always be read through an index
+WATCHED_TABLES = {"books", "likes"}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (email, password)
+    SELECT 'plan-' || g || '-' || md5(random()::text) || '@example.com', 'x'
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO categories (name, slug)
+    SELECT 'plan-category-' || g || '-' || md5(random()::text), 'plan-category-' || g || '-' || md5(random()::text)
+    FROM generate_series(1, 20) AS g
+    """,
+    """
+    INSERT INTO languages (name, code)
+    SELECT 'plan-' || g || '-' || left(md5(random()::text), 8), left(md5(random()::text), 10)
+    FROM generate_series(1, 5) AS g
+    """,
+    """
+    INSERT INTO books (title, author, images, seller_id, category_id, language_id,
+                       listing_type, price, status, like_count, created_at, updated_at)
+    SELECT 'Plan book ' || g, 'Author ' || (g % 5000), '[]',
+           (SELECT max(id) FROM users) - (g % :users),
+           (SELECT max(id) FROM categories) - (g % 20),
+           (SELECT max(id) FROM languages) - (g % 5),
+           'SELL', (g % 1000) / 10.0,
+           CASE WHEN g % 20 = 0 THEN 'PENDING' WHEN g % 20 = 1 THEN 'REJECTED' ELSE 'APPROVED' END::listingstatus,
+           g % 97, now() - g * interval '1 minute', now()
+    FROM generate_series(1, :books) AS g
+    """,
+    """
+    INSERT INTO likes (user_id, book_id, created_at)
+    SELECT (SELECT max(id) FROM users) - (g % :users),
+           (SELECT max(id) FROM books) - ((g * 7919) % :books),
+           now() - g * interval '1 second'
+    FROM generate_series(1, :likes) AS g
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+
+def _books_page(**filters) -> Select:
+    """The page statement of GET /books with these query parameters"""
+    params = BookFilterParams(**filters)
+    return public_books_page(public_books_query(params), params)
+
+
+async def _sample_ids(conn: AsyncConnection) -> Dict[str, object]:
+    seller_id = await conn.scalar(
+        select(Book.seller_id).group_by(Book.seller_id).order_by(func.count().desc()).limit(1)
+    )
+    user_id = await conn.scalar(
+        select(Like.user_id).group_by(Like.user_id).order_by(func.count().desc()).limit(1)
+    )
+    category_id, language_id = (await conn.execute(
+        select(Book.category_id, Book.language_id).order_by(Book.id.desc()).limit(1)
+    )).one()
+    middle = (await conn.execute(
+        select(Book.created_at, Book.id)
+        .where(Book.status == ListingStatus.APPROVED)
+        .order_by(Book.created_at.desc(), Book.id.desc())
+        .offset(1000).limit(1)
+    )).one()
+    return {
+        "seller_id": seller_id,
+        "user_id": user_id,
+        "category_id": category_id,
+        "language_id": language_id,
+        "middle": tuple(middle),
+    }
+
+
+def hot_queries(ids: Dict[str, object]) -> List[Tuple[str, Select]]:
+    middle = encode_cursor(BookOrdering.NEWEST.value, *ids["middle"])
+    return [
+        ("books newest", _books_page()),
+        ("books newest, next page", _books_page(cursor=middle)),
+        ("books by category", _books_page(category_id=ids["category_id"])),
+        ("books by category, count", count_query(
+            public_books_query(BookFilterParams(category_id=ids["category_id"]))
+        )),
+        ("books by language", _books_page(language_id=ids["language_id"])),
+        ("books by price", _books_page(min_price=10, max_price=11)),
+        ("books by search", _books_page(search="plan book 4242")),
+        ("books popular", _books_page(order_by=BookOrdering.POPULAR)),
+        ("my listings", seller_listings_page(seller_listings_query(ids["seller_id"]), 1, 10)),
+        ("saved books", saved_books_page(saved_books_query(ids["user_id"]), 1, 10)),
+        ("liked ids", liked_set_query(ids["user_id"])),
+        ("moderation queue", moderation_queue_page(50)),
+    ]
+
+
+def _plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def explain(conn: AsyncConnection, query: Select) -> dict:
+    sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def run(books: int, users: int, likes: int) -> dict:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("plan_regression needs a PostgreSQL DATABASE_URL")
+
+    report = {"books": books, "users": users, "likes": likes, "queries": {}, "failures": []}
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            for statement in SEED_SQL:
+                sql = statement.replace(":users", str(users)).replace(":books", str(books)).replace(":likes", str(likes))
+                await conn.exec_driver_sql(sql)
+            await conn.exec_driver_sql("ANALYZE users, categories, languages, books, likes")
+
+            ids = await _sample_ids(conn)
+            for name, query in hot_queries(ids):
+                plan = await explain(conn, query)
+                nodes = list(_plan_nodes(plan))
+                seq_scans = sorted({
+                    node["Relation Name"] for node in nodes
+                    if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in WATCHED_TABLES
+                })
+                report["queries"][name] = {
+                    "cost": plan["Total Cost"],
+                    "indexes": sorted({node["Index Name"] for node in nodes if "Index Name" in node}),
+                    "seq_scans": seq_scans,
+                }
+                if seq_scans:
+                    report["failures"].append(name)
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+    report["checked_at"] = datetime.now(timezone.utc).isoformat()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--likes", type=int, default=100_000)
+    args = parser.parse_args()
+    report = asyncio.run(run(args.books, args.users, args.likes))
+    print(json.dumps(report, indent=2))
+    if report["failures"]:
+        print(f"Sequential scans in: {', '.join(report['failures'])}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""CPU time and memory of one GET /books page and one book detail, per read path.
+
+    python -m benchmarks.read_path --page-size 100 --rounds 50
+
+Runs the listing and detail queries against the generated catalog in
+DATABASE_URL (see benchmarks.generator) two ways: ORM entities validated
+by pydantic, and Core column rows mapped straight to dicts and dumped with
+orjson (what the routers do). Every round uses a fresh
+session, like a request. CPU time is process time, so it includes driver
+decoding but not waiting on the database; memory is the tracemalloc peak of
+a single round.
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.database import AsyncSessionLocal, engine
+from app.models.book import Book, ListingStatus
+from app.models.category import Category
+from app.models.language import Language
+from app.models.user import User
+from app.schemas.book import BookDetail, BookListResponse
+from app.utils.serialization import (
+    BOOK_COLUMNS, BOOK_DETAIL_COLUMNS, book_detail_serializer, book_list, book_serializer, dumps
+)
+
+
+def _page_query(columns, page_size: int):
+    return (
+        select(*columns)
+        .where(Book.status == ListingStatus.APPROVED)
+        .order_by(Book.created_at.desc(), Book.id.desc())
+        .limit(page_size)
+    )
+
+
+def _page_body(items, page_size: int) -> dict:
+    return book_list(items=items, total=None, total_is_exact=False, page=1, page_size=page_size, total_pages=None)
+
+
+async def page_orm_pydantic(page_size: int, book_id: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        books = (await db.execute(_page_query([Book], page_size))).scalars().all()
+        return BookListResponse(
+            items=books, total=None, total_is_exact=False, page=1, page_size=page_size, total_pages=None
+        ).model_dump_json().encode()
+
+
+async def page_core(page_size: int, book_id: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(_page_query(BOOK_COLUMNS, page_size))
+        return dumps(_page_body([book_serializer.from_row(row) for row in result], page_size))
+
+
+def _detail_orm_query(book_id: int):
+    return select(Book).options(
+        selectinload(Book.seller), selectinload(Book.category), selectinload(Book.language)
+    ).where(Book.id == book_id)
+
+
+async def detail_orm_pydantic(page_size: int, book_id: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        book = (await db.execute(_detail_orm_query(book_id))).scalar_one()
+        return BookDetail.model_validate(book).model_dump_json().encode()
+
+
+async def detail_core(page_size: int, book_id: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(*BOOK_DETAIL_COLUMNS)
+            .select_from(Book)
+            .join(User, Book.seller_id == User.id)
+            .outerjoin(Category, Book.category_id == Category.id)
+            .outerjoin(Language, Book.language_id == Language.id)
+            .where(Book.id == book_id)
+        )).one()
+        return dumps(book_detail_serializer.from_row(row, is_liked=False))
+
+
+PATHS = {
+    "list": {"orm_pydantic": page_orm_pydantic, "core": page_core},
+    "detail": {"orm_pydantic": detail_orm_pydantic, "core": detail_core},
+}
+
+
+async def measure(path: Callable[[int, int], Awaitable[bytes]], page_size: int, book_id: int, rounds: int) -> dict:
+    await path(page_size, book_id)  # Warm up connections and statement caches
+    started_cpu = time.process_time()
+    started_wall = time.perf_counter()
+    for _ in range(rounds):
+        await path(page_size, book_id)
+    cpu = (time.process_time() - started_cpu) / rounds
+    wall = (time.perf_counter() - started_wall) / rounds
+
+    tracemalloc.start()
+    await path(page_size, book_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cpu_ms": round(cpu * 1000, 3), "wall_ms": round(wall * 1000, 3), "peak_kb": round(peak / 1024, 1)}
+
+
+async def run(page_size: int, rounds: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        book_id = (await db.execute(_page_query([Book.id], 1))).scalar()
+    if book_id is None:
+        raise SystemExit("No approved books found, run python -m benchmarks.generator first")
+
+    results = {}
+    for name, paths in PATHS.items():
+        bodies = {label: json.loads(await path(page_size, book_id)) for label, path in paths.items()}
+        if len({json.dumps(body, sort_keys=True) for body in bodies.values()}) != 1:
+            raise SystemExit(f"{name}: read paths return different bodies")
+        results[name] = {label: await measure(path, page_size, book_id, rounds) for label, path in paths.items()}
+    await engine.dispose()
+    return {"page_size": page_size, "rounds": rounds, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.page_size, args.rounds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
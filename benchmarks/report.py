@@ -0,0 +1,132 @@
+"""Latency samples per endpoint, summarized and stored as JSON.
+
+    python -m benchmarks.report compare results/before.json results/after.json
+
+Reports written by the driver can be compared run against run; compare
+prints the change in throughput and p50/p95/p99 per endpoint.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Recorder:
+    """Collects (endpoint, seconds, status code) samples of one run"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def add(self, endpoint: str, seconds: float, status_code: int) -> None:
+        self.latencies[endpoint].append(seconds)
+        if status_code >= 500 or status_code == 0:
+            self.errors[endpoint] += 1
+
+    def stop(self) -> None:
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self) -> Dict[str, dict]:
+        elapsed = self.elapsed
+        endpoints = {}
+        for endpoint in sorted(self.latencies):
+            samples = self.latencies[endpoint]
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors[endpoint],
+                "throughput_rps": round(len(samples) / elapsed, 1),
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+                **{f"p{pct}_ms": round(percentile(samples, pct) * 1000, 2) for pct in PERCENTILES},
+            }
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / elapsed, 1),
+            "endpoints": endpoints,
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(recorder: Recorder, config: dict) -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": config,
+        **recorder.summary(),
+    }
+
+
+def save(report: dict, path: str) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(before: dict, after: dict) -> List[str]:
+    """One line per endpoint present in both reports"""
+    lines = [f"{'endpoint':<32} {'rps':>9} " + " ".join(f"{f'p{pct}':>9}" for pct in PERCENTILES)]
+    for endpoint, new in after["endpoints"].items():
+        old = before["endpoints"].get(endpoint)
+        if old is None:
+            continue
+        changes = [_change(old["throughput_rps"], new["throughput_rps"])]
+        changes += [_change(old[f"p{pct}_ms"], new[f"p{pct}_ms"]) for pct in PERCENTILES]
+        lines.append(f"{endpoint:<32} " + " ".join(f"{change:>9}" for change in changes))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff = commands.add_parser("compare", help="Compare two driver reports")
+    diff.add_argument("before")
+    diff.add_argument("after")
+    args = parser.parse_args()
+
+    before = json.loads(Path(args.before).read_text())
+    after = json.loads(Path(args.after).read_text())
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    for line in compare(before, after):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()